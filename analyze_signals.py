@@ -1,87 +1,178 @@
 #!/usr/bin/env python3
 """Analyze why signals aren't generating."""
 
+import os
 import re
 
-# Read last part of log file
-with open("trading_20250810.log") as f:
-    lines = f.readlines()[-1000:]  # Last 1000 lines
-
-# Track signal statistics
-rsi_stats = {"oversold_count": 0, "crossed_up": 0, "values": []}
+import numpy as np
+import orjson
+
+LOG_FILE = "trading_20250810.log"
+# Structured events written by utils.logger alongside the text log
+SIGNALS_FILE = "signals_20250810.jsonl"
+TAIL_LINES = 1000
+TAIL_BLOCK_SIZE = 64 * 1024
+
+# One alternation per log tag; each outer group closes last, so ``lastgroup``
+# names the tag that matched. The leading lookahead on the tags' first bytes
+# lets the engine reject almost every position with one class test instead of
+# trying all six branches.
+LOG_RE = re.compile(
+    rb"(?=[RWPT])"
+    rb"(?:(?P<rsi>RSI:[^\n]*?current=(?P<rsi_value>[\d.]+), "
+    rb"oversold=(?P<oversold>\w+), crossed_up=(?P<crossed_up>\w+))"
+    rb"|(?P<wae>WAE:[^\n]*?explosion=(?P<explosion>[\d.-]+), "
+    rb"trend=(?P<trend>[\d.-]+), deadzone=(?P<deadzone>[\d.-]+))"
+    rb"|(?P<price_high>Price:[^\n]*?close=(?P<high_close>[\d.]+), prev_high=(?P<prev_high>[\d.]+))"
+    rb"|(?P<price_low>Price:[^\n]*?close=(?P<low_close>[\d.]+), prev_low=(?P<prev_low>[\d.]+))"
+    rb"|(?P<pattern>Pattern result:[^\n]*?OB=(?P<ob>\w+), FVG=(?P<fvg>\w+))"
+    rb"|(?P<mode>TRADE MODE:[^\n]*?(?P<mode_name>LONG_ONLY|SHORT_ONLY|NO_TRADE)))"
+)
+
+# The regex captures the mode token in one scan; map it straight to its counter
+TRADE_MODE_KEYS = {b"LONG_ONLY": "long_only", b"SHORT_ONLY": "short_only", b"NO_TRADE": "no_trade"}
+
+
+def read_tail(path: str, count: int, block_size: int = TAIL_BLOCK_SIZE) -> bytes:
+    """Return the last ``count`` lines of ``path`` without reading the whole file."""
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        blocks: list[bytes] = []
+        newlines = 0
+        # One extra newline guarantees the first kept line is complete
+        while pos > 0 and newlines <= count:
+            size = min(block_size, pos)
+            pos -= size
+            f.seek(pos)
+            block = f.read(size)
+            blocks.append(block)
+            newlines += block.count(b"\n")
+
+    tail = b"".join(reversed(blocks)).splitlines(keepends=True)[-count:]
+    return b"".join(tail)
+
+
+class RsiHistogram:
+    """Bin RSI readings 0..100 instead of keeping every value; memory stays O(1)."""
+
+    def __init__(self) -> None:
+        self.bins = np.zeros(101, dtype=np.int64)
+        # Exact running aggregates so the report doesn't lose the decimals to binning
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def add(self, value: bytes | float) -> None:
+        rsi = float(value)
+        self.bins[min(100, int(rsi))] += 1
+        self.total += rsi
+        self.min = min(self.min, rsi)
+        self.max = max(self.max, rsi)
+
+    @property
+    def count(self) -> int:
+        return int(self.bins.sum())
+
+
+def count_true(flags: list, width: int) -> list[int]:
+    """Count true flags per column of a flat, row-major list of flag fields.
+
+    Fields are either ``b"True"``/``b"False"`` from the text log or JSON
+    booleans, which the ``S5`` cast renders the same way.
+    """
+    mask = np.asarray(flags, dtype="S5").reshape(-1, width) == b"True"
+    return [int(n) for n in np.count_nonzero(mask, axis=0)]
+
+
+# Track signal statistics; numeric and flag fields are collected as-is (raw
+# bytes from the text log, JSON scalars from the events file) and
+# parsed/counted in bulk with NumPy once the scan is done.
+rsi_stats = {"oversold_count": 0, "crossed_up": 0}
 wae_stats = {"positive_explosion": 0, "positive_trend": 0, "both_positive": 0}
 price_stats = {"breaks_up": 0, "breaks_down": 0}
 pattern_stats = {"ob_found": 0, "fvg_found": 0}
 trend_stats = {"long_only": 0, "short_only": 0, "no_trade": 0}
 
-for line in lines:
-    # RSI Analysis
-    if "RSI:" in line:
-        match = re.search(r"current=([\d.]+), oversold=(\w+), crossed_up=(\w+)", line)
-        if match:
-            rsi_val = float(match.group(1))
-            oversold = match.group(2) == "True"
-            crossed = match.group(3) == "True"
-            rsi_stats["values"].append(rsi_val)
-            if oversold:
-                rsi_stats["oversold_count"] += 1
-            if crossed:
-                rsi_stats["crossed_up"] += 1
-
-    # WAE Analysis
-    if "WAE:" in line:
-        match = re.search(r"explosion=([\d.-]+), trend=([\d.-]+), deadzone=([\d.-]+)", line)
-        if match:
-            explosion = float(match.group(1))
-            trend = float(match.group(2))
-            deadzone = float(match.group(3))
-            if explosion > deadzone:
-                wae_stats["positive_explosion"] += 1
-                if trend > 0:
-                    wae_stats["positive_trend"] += 1
-                    wae_stats["both_positive"] += 1
-
-    # Price Break Analysis
-    if "Price:" in line:
-        match = re.search(r"close=([\d.]+), prev_high=([\d.]+)", line)
-        if match:
-            close = float(match.group(1))
-            prev_high = float(match.group(2))
-            if close > prev_high:
-                price_stats["breaks_up"] += 1
-        elif "prev_low" in line:
-            match = re.search(r"close=([\d.]+), prev_low=([\d.]+)", line)
-            if match:
-                close = float(match.group(1))
-                prev_low = float(match.group(2))
-                if close < prev_low:
-                    price_stats["breaks_down"] += 1
-
-    # Pattern Analysis
-    if "Pattern result:" in line:
-        if "OB=True" in line:
-            pattern_stats["ob_found"] += 1
-        if "FVG=True" in line:
-            pattern_stats["fvg_found"] += 1
-
-    # Trade Mode Analysis
-    if "TRADE MODE:" in line:
-        if "LONG_ONLY" in line:
-            trend_stats["long_only"] += 1
-        elif "SHORT_ONLY" in line:
-            trend_stats["short_only"] += 1
-        elif "NO_TRADE" in line:
-            trend_stats["no_trade"] += 1
+rsi_hist = RsiHistogram()
+rsi_flags: list = []
+wae_values: list = []
+high_breaks: list = []
+low_breaks: list = []
+pattern_flags: list = []
+
+if os.path.exists(SIGNALS_FILE):
+    # Events are already structured at the source, so no text parsing is needed
+    # The strategy no longer computes RSI, so the events file has no RSI records;
+    # only text logs from older runs feed the RSI section
+    for line in read_tail(SIGNALS_FILE, TAIL_LINES).splitlines():
+        try:
+            event = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            continue  # Last line may still be mid-write by the live logger
+        kind = event["evt"]
+
+        if kind == "WAE":
+            wae_values.extend((event["explosion"], event["trend"], event["deadzone"]))
+
+        elif kind == "PRICE":
+            if "prev_high" in event:
+                high_breaks.extend((event["close"], event["prev_high"]))
+            else:
+                low_breaks.extend((event["close"], event["prev_low"]))
+
+        elif kind == "PATTERN":
+            pattern_flags.extend((event["ob"], event["fvg"]))
+
+        elif kind == "TRADE_MODE":
+            trend_stats[event["mode"]] += 1
+else:
+    # Older runs only have the text log; scan its tail as raw bytes, never decoded
+    for match in LOG_RE.finditer(read_tail(LOG_FILE, TAIL_LINES)):
+        kind = match.lastgroup
+
+        if kind == "rsi":
+            rsi_hist.add(match["rsi_value"])
+            rsi_flags.extend(match.group("oversold", "crossed_up"))
+
+        elif kind == "wae":
+            wae_values.extend(match.group("explosion", "trend", "deadzone"))
+
+        elif kind == "price_high":
+            high_breaks.extend(match.group("high_close", "prev_high"))
+
+        elif kind == "price_low":
+            low_breaks.extend(match.group("low_close", "prev_low"))
+
+        elif kind == "pattern":
+            pattern_flags.extend(match.group("ob", "fvg"))
+
+        elif kind == "mode":
+            trend_stats[TRADE_MODE_KEYS[match["mode_name"]]] += 1
 
 # Calculate statistics
-total_signals = len(rsi_stats["values"])
-if rsi_stats["values"]:
-    avg_rsi = sum(rsi_stats["values"]) / len(rsi_stats["values"])
-    min_rsi = min(rsi_stats["values"])
-    max_rsi = max(rsi_stats["values"])
+total_signals = rsi_hist.count
+if total_signals:
+    avg_rsi = rsi_hist.total / total_signals
+    min_rsi = rsi_hist.min
+    max_rsi = rsi_hist.max
 else:
     avg_rsi = min_rsi = max_rsi = 0
 
+rsi_stats["oversold_count"], rsi_stats["crossed_up"] = count_true(rsi_flags, 2)
+
+explosion, trend, deadzone = np.asarray(wae_values, dtype=np.float64).reshape(-1, 3).T
+above_deadzone = explosion > deadzone
+wae_stats["positive_explosion"] = int(np.count_nonzero(above_deadzone))
+wae_stats["positive_trend"] = int(np.count_nonzero(above_deadzone & (trend > 0)))
+wae_stats["both_positive"] = wae_stats["positive_trend"]
+
+close, prev_high = np.asarray(high_breaks, dtype=np.float64).reshape(-1, 2).T
+price_stats["breaks_up"] = int(np.count_nonzero(close > prev_high))
+close, prev_low = np.asarray(low_breaks, dtype=np.float64).reshape(-1, 2).T
+price_stats["breaks_down"] = int(np.count_nonzero(close < prev_low))
+
+pattern_stats["ob_found"], pattern_stats["fvg_found"] = count_true(pattern_flags, 2)
+
 print("="*60)
 print("SIGNAL ANALYSIS REPORT")
 print("="*60)
@@ -119,7 +210,8 @@ print("="*60)
 
 issues = []
 
-if rsi_stats["crossed_up"] == 0:
+# No RSI readings at all (events file) says nothing about RSI crossing
+if total_signals and rsi_stats["crossed_up"] == 0:
     issues.append("❌ RSI never crosses UP above 40 (needed for long entry)")
 
 if wae_stats["both_positive"] == 0:
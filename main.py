@@ -1,6 +1,12 @@
 import asyncio
+import logging
 import signal
+import time
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable, Coroutine
+from dataclasses import dataclass
 from datetime import datetime
+from enum import IntEnum
 from typing import Any
 
 from project_x_py import Order, TradingSuite
@@ -10,6 +16,54 @@ from project_x_py.indicators import ATR
 from strategy import ExitManager, OrderBookAnalyzer, SignalGenerator, TrendAnalyzer
 from utils import Config, setup_logger
 
+# Oldest entries are evicted past this; filled entries are never removed otherwise
+MAX_PENDING_ORDERS = 64
+
+# Bound once at import; called on every bar event
+_now = datetime.now
+_monotonic = time.monotonic
+_create_task = asyncio.create_task
+
+
+class OrderStatus(IntEnum):
+    """Lifecycle of a tracked entry order."""
+
+    PENDING = 0
+    ACTIVE = 1
+
+
+@dataclass(slots=True)
+class PendingOrder:
+    """Entry order submitted through managed_trade and awaiting a fill."""
+
+    id: int
+    direction: str
+    entry_price: float
+    stop_price: float
+    target_price: float
+    status: OrderStatus
+    created_at: datetime
+
+
+@dataclass(slots=True)
+class LatestBar:
+    """Most recent bar received for one timeframe, updated in place on every event."""
+
+    received_at: float | None = None  # time.monotonic() when the event arrived
+    open: float = 0.0
+    high: float = 0.0
+    low: float = 0.0
+    close: float = 0.0
+    volume: float = 0.0
+
+    def update(self, received_at: float, bar_data: dict) -> None:
+        self.received_at = received_at
+        self.open = bar_data.get("open", 0.0)
+        self.high = bar_data.get("high", 0.0)
+        self.low = bar_data.get("low", 0.0)
+        self.close = bar_data.get("close", 0.0)
+        self.volume = bar_data.get("volume", 0)
+
 
 class TrendMomentumXStrategy:
     def __init__(self):
@@ -21,28 +75,57 @@ class TrendMomentumXStrategy:
         self.exit_manager: ExitManager | None = None
         self.running = False
         self.stop_event = asyncio.Event()
+        # Rolling mean of the last volume_avg_bars 1min volumes, kept with a running sum
+        self.volume_avg_bars = 20
         self.volume_avg_1min = 0.0
-        self.pending_orders: dict[str, dict] = {}  # Track pending orders
-        self.last_daily_reset = datetime.now().date()
-        self.last_weekly_reset = datetime.now().date()
-        self.last_event_time = None  # Track when we last received a real event
+        self._volume_window: deque[float] = deque(maxlen=self.volume_avg_bars)
+        self._volume_sum = 0.0
+        # Track pending orders by Order.id, bounded to MAX_PENDING_ORDERS
+        self.pending_orders: OrderedDict[int, PendingOrder] = OrderedDict()
+        today = _now().date()
+        self.last_daily_reset = today
+        self.last_weekly_reset = today
+        self._signal_in_flight = False  # Set by on_new_bar, cleared by process_trading_signal
+        # Strong refs to detached tasks so they aren't GC'd mid-run and can be reaped on shutdown
+        self._background_tasks: set[asyncio.Task] = set()
+        self.last_event_time_mono: float | None = None  # Monotonic time of the last real event
 
         # Cache latest bar data from events to avoid blocking get_data calls
-        self.latest_bars = {
-            "15sec": None,
-            "1min": None,
-            "5min": None,
-            "15min": None
+        self.latest_bars = {timeframe: LatestBar() for timeframe in ("15sec", "1min")}
+
+        # Event handlers registered on initialize() and removed again on shutdown().
+        # The bus only takes one event type per on() call, so cancel/reject share a
+        # single bound method object rather than two equal-but-distinct ones.
+        on_order_failed = self.on_order_failed
+        self._subscriptions: dict[EventType, Callable[[Event], Awaitable[None]]] = {
+            EventType.NEW_BAR: self.on_new_bar,
+            EventType.ORDER_FILLED: self.on_order_filled,
+            EventType.ORDER_CANCELLED: on_order_failed,
+            EventType.ORDER_REJECTED: on_order_failed,
+            EventType.POSITION_CLOSED: self.on_position_closed,
         }
 
         # -- Settings moved from custom RiskManager --
         self.atr_period = Config.ATR_PERIOD
+        self.volume_threshold_percent = Config.VOLUME_THRESHOLD_PERCENT
         self.stop_ticks = Config.STOP_TICKS
         self.rr_ratio = Config.RR_RATIO
+        self._tick_stop_distance: float | None = None  # stop_ticks * tickSize, set on initialize()
+
+        # Wilder ATR of the 1min series, seeded from history on initialize() and
+        # then updated incrementally from NEW_BAR events
+        self.atr_1min = 0.0
+        self._atr_samples = 0
+        self._prev_close_1min: float | None = None
+        self._last_1min_ts: Any = None  # Timestamp of the last completed 1min bar folded in
 
     async def initialize(self):
         self.logger.info("Initializing TrendMomentumX Strategy...")
-        self.logger.info(f"Configuration: {Config.get_all_settings()}")
+        # Also goes to the orjson-encoded signals file so analyses know the thresholds
+        settings = Config.get_all_settings()
+        self.logger.info(
+            "Configuration: %s", settings, extra={"event": {"evt": "CONFIG", "settings": settings}}
+        )
 
         try:
             self.suite = await TradingSuite.create(
@@ -52,75 +135,147 @@ class TrendMomentumXStrategy:
                 features=["orderbook", "risk_manager"],  # Enable orderbook and risk manager
             )
 
+            # Instrument constants don't change after connect; resolve them once here
+            instrument = self.suite.instrument
+            if instrument and hasattr(instrument, "tickSize"):
+                self._tick_stop_distance = self.stop_ticks * instrument.tickSize
+
             self.trend_analyzer = TrendAnalyzer(self.suite)
             self.signal_generator = SignalGenerator(self.suite)
             self.orderbook_analyzer = OrderBookAnalyzer(self.suite)
             self.exit_manager = ExitManager(self.suite)
 
             # Subscribe to events using the TradingSuite's on method directly
-            await self.suite.on(EventType.NEW_BAR, self.on_new_bar)
-            self.logger.debug("Subscribed to NEW_BAR events")
-            await self.suite.on(EventType.ORDER_FILLED, self.on_order_filled)
-            self.logger.debug("Subscribed to ORDER_FILLED events")
-            await self.suite.on(EventType.ORDER_CANCELLED, self.on_order_failed)
-            await self.suite.on(EventType.ORDER_REJECTED, self.on_order_failed)
-            await self.suite.on(EventType.POSITION_CLOSED, self.on_position_closed)
+            await asyncio.gather(
+                *(
+                    self.suite.on(event_type, handler)
+                    for event_type, handler in self._subscriptions.items()
+                )
+            )
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "Subscribed to %s events", ", ".join(t.name for t in self._subscriptions)
+                )
             self.logger.info("Event subscriptions registered")
 
-            # Debug: Check if we can get current data manually
-            try:
-                test_data = await self.suite.data.get_data("15sec", bars=2)
-                if test_data is not None and len(test_data) > 0:
-                    last_bar = test_data.tail(1)
-                    self.logger.debug(f"Manual data check - Last 15sec bar: Close={last_bar['close'][0]:.2f}, Volume={last_bar['volume'][0]}")
-                    # Also check timestamp to see how recent the data is
-                    if 'timestamp' in test_data.columns:
-                        last_time = test_data.tail(1)['timestamp'][0]
-                        self.logger.debug(f"Last bar timestamp: {last_time}")
-                else:
-                    self.logger.warning("No data available from manual check")
-            except Exception as e:
-                self.logger.error(f"Error checking manual data: {e}")
+            # Independent reads of different timeframes; let them overlap
+            await asyncio.gather(self.check_manual_data(), self.seed_from_history())
 
             self.logger.info("Strategy initialized successfully")
             self.running = True
 
         except Exception as e:
-            self.logger.error(f"Failed to initialize strategy: {e}")
+            self.logger.error("Failed to initialize strategy: %s", e)
             raise
 
+    async def check_manual_data(self):
+        """Debug: Check if we can get current data manually."""
+        try:
+            if not self.suite:
+                return
+
+            test_data = await self.suite.data.get_data("15sec", bars=2)
+            if test_data is not None and len(test_data) > 0:
+                # One dict for the last bar instead of a tail() frame per column read
+                last_bar = test_data.row(-1, named=True)
+                self.logger.debug(
+                    "Manual data check - Last 15sec bar: Close=%.2f, Volume=%s",
+                    last_bar["close"],
+                    last_bar["volume"],
+                )
+                # Also check timestamp to see how recent the data is
+                if 'timestamp' in last_bar:
+                    self.logger.debug("Last bar timestamp: %s", last_bar['timestamp'])
+            else:
+                self.logger.warning("No data available from manual check")
+        except Exception as e:
+            self.logger.error("Error checking manual data: %s", e)
+
     # -- Helper methods moved from custom RiskManager --
-    async def _calculate_stop_price(self, entry_price: float, direction: str) -> float:
-        if not self.suite:
-            raise ValueError("TradingSuite not initialized")
+    async def seed_from_history(self):
+        """Seed the incremental 1min volume average and ATR from the bars loaded at startup."""
+        try:
+            if not self.suite:
+                return
 
-        data_1m = await self.suite.data.get_data("1min")
-        if data_1m is None:
-            self.logger.error("No 1min data available")
-            return entry_price
+            # Wilder's smoothing forgets its starting value within ~10 periods (weight
+            # ~e**-10), so there is no need to pipe the whole cached history through ATR
+            # One extra bar: the last row is still forming and is left out of both stats
+            data_1m = await self.suite.data.get_data("1min", bars=self.atr_period * 10 + 1)
+            if data_1m is None or data_1m.is_empty():
+                return
+            completed = data_1m.head(-1)
+            if completed.is_empty():
+                return
+
+            for volume in completed["volume"].tail(self.volume_avg_bars):
+                self._push_volume(float(volume))
+            self._last_1min_ts = completed["timestamp"].item(-1)
+            self.logger.debug("Seeded volume average at %.2f", self.volume_avg_1min)
+
+            if len(completed) < self.atr_period:
+                return
+
+            completed = completed.pipe(ATR, period=self.atr_period)
+            self.atr_1min = float(completed[f"atr_{self.atr_period}"].item(-1))
+            self._atr_samples = self.atr_period
+            self._prev_close_1min = float(completed["close"].item(-1))
+            self.logger.debug("Seeded 1min ATR at %.2f", self.atr_1min)
+        except Exception as e:
+            self.logger.error("Error seeding from history: %s", e)
+
+    async def fold_completed_1min_bar(self):
+        """Fold the 1min bar that just closed into the volume average and ATR."""
+        try:
+            if not self.suite:
+                return
+
+            # NEW_BAR fires when a bar opens and carries only its first tick, so the bar
+            # that just closed is the second-to-last row
+            data_1m = await self.suite.data.get_data("1min", bars=2)
+            if data_1m is None or len(data_1m) < 2:
+                return
+            row = data_1m.row(-2, named=True)
+            # Events can overlap, and the seed may already cover this bar
+            if self._last_1min_ts is not None and row["timestamp"] <= self._last_1min_ts:
+                return
+            self._last_1min_ts = row["timestamp"]
+
+            completed = LatestBar()
+            completed.update(_monotonic(), row)
+            self.update_volume_average_from_event(completed)
+            self.update_atr_from_event(completed)
+        except Exception as e:
+            self.logger.error("Error folding completed 1min bar: %s", e)
+
+    def update_atr_from_event(self, bar: LatestBar):
+        """Fold one 1min bar into the ATR using Wilder's smoothing."""
+        try:
+            high = float(bar.high)
+            low = float(bar.low)
+            prev_close = self._prev_close_1min
+            true_range = high - low
+            if prev_close is not None:
+                true_range = max(true_range, abs(high - prev_close), abs(low - prev_close))
+            self._prev_close_1min = float(bar.close)
+
+            # Plain running mean until a full period is seen, Wilder's average after
+            self._atr_samples = min(self._atr_samples + 1, self.atr_period)
+            self.atr_1min += (true_range - self.atr_1min) / self._atr_samples
+            self.logger.debug("Updated 1min ATR to %.2f", self.atr_1min)
+        except Exception as e:
+            self.logger.error("Error updating ATR from event: %s", e)
 
-        if not data_1m.is_empty() and len(data_1m) >= self.atr_period:
-            data_1m = data_1m.pipe(ATR, period=self.atr_period)
-            atr_value = data_1m.tail(1)["atr_14"][0]
-            stop_price = entry_price - atr_value if direction == "long" else entry_price + atr_value
+    async def _calculate_stop_price(self, entry_price: float, direction: str) -> float:
+        # A partial-period ATR can be a single bar's range; only trust it once warmed up
+        if self._atr_samples >= self.atr_period and self.atr_1min > 0:
+            stop_distance = self.atr_1min
+        elif self._tick_stop_distance is not None:
+            stop_distance = self._tick_stop_distance
         else:
-            instrument = self.suite.instrument
-            if instrument and hasattr(instrument, "tickSize"):
-                tick_size = instrument.tickSize
-                stop_distance = self.stop_ticks * tick_size
-                stop_price = (
-                    entry_price - stop_distance
-                    if direction == "long"
-                    else entry_price + stop_distance
-                )
-            else:
-                # Fallback if instrument info is missing
-                stop_distance = entry_price * 0.01
-                stop_price = (
-                    entry_price - stop_distance
-                    if direction == "long"
-                    else entry_price + stop_distance
-                )
+            # Fallback if instrument info is missing
+            stop_distance = entry_price * 0.01
+        stop_price = entry_price - stop_distance if direction == "long" else entry_price + stop_distance
         return float(stop_price)
 
     def _calculate_target_price(
@@ -133,27 +288,40 @@ class TrendMomentumXStrategy:
         )
         return target_price
 
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        """Run a coroutine as a tracked background task."""
+        task = _create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
     async def on_new_bar(self, event: Any):
         """Handle new OHLCV bar events."""
         try:
             # Update last event time
-            self.last_event_time = datetime.now()
+            now = _monotonic()
+            self.last_event_time_mono = now
 
             # Event structure from project-x-py: event.data contains {'timeframe': '...', 'data': {bar data}}
-            data = event.data if hasattr(event, "data") else {}
-            timeframe = data.get("timeframe", "unknown")
-            bar_data = data.get("data", {})
+            # Malformed events raise here and are logged by the except below
+            data = event.data
+            timeframe = data["timeframe"]
+            bar_data = data["data"]
+
+            # Only 15sec (signals) and 1min (volume/ATR) bars are consumed; the higher
+            # timeframes are read on demand by the trend analyzer
+            latest_bar = self.latest_bars.get(timeframe)
+            if latest_bar is None:
+                return
 
             # Cache the latest bar data for this timeframe
-            if timeframe in self.latest_bars and bar_data:
-                self.latest_bars[timeframe] = {
-                    "timestamp": datetime.now(),
-                    "data": bar_data
-                }
+            if bar_data:
+                latest_bar.update(now, bar_data)
 
             self.logger.debug(
-                f"New {timeframe} bar: "
-                f"C={bar_data.get('close', 0):.2f} V={bar_data.get('volume', 0)}"
+                "New %s bar: C=%.2f V=%s",
+                timeframe,
+                bar_data.get("close", 0),
+                bar_data.get("volume", 0),
             )
 
             if not self.running:
@@ -161,85 +329,52 @@ class TrendMomentumXStrategy:
 
             # Only process signals on the primary timeframe (15sec)
             if timeframe != "15sec":
-                # Update 1-minute volume average on 1-minute bars
+                # Update 1-minute volume average and ATR on 1-minute bars
                 if timeframe == "1min" and bar_data:
-                    self.logger.debug("Updating 1-minute volume average from cached data")
-                    # Update volume average directly from the event data
-                    self.update_volume_average_from_event(bar_data)
+                    # The payload is the bar that just opened, one tick's volume and range;
+                    # the stats need the bar that closed
+                    self.logger.debug("Updating 1-minute volume average and ATR")
+                    self._spawn(self.fold_completed_1min_bar())
+                return
+
+            # Single-flight: if the previous bar's pipeline is still running, this bar
+            # would only repeat the same fetches and indicator work, so drop it
+            if self._signal_in_flight:
+                self.logger.debug("Signal processing still in flight, skipping 15sec bar")
                 return
 
             self.logger.debug("Processing trading signal for 15sec timeframe")
-            # Instead of processing immediately, create a task to process outside event handler
-            asyncio.create_task(self._process_signal_task(bar_data))
+            # Run in its own task so a slow signal check doesn't hold up the event bus
+            self._signal_in_flight = True
+            self._spawn(self.process_trading_signal())
         except Exception as e:
-            self.logger.error(f"Error processing new bar event: {e}", exc_info=True)
+            self.logger.error("Error processing new bar event: %s", e, exc_info=True)
             # Don't re-raise - keep event handler alive
 
-    async def _process_signal_task(self, bar_data: dict):
-        """Process signal in a separate task outside event handler context."""
+    def _push_volume(self, volume: float):
+        """Slide the volume window by one bar, updating the running sum in O(1)."""
+        window = self._volume_window
+        if len(window) == window.maxlen:
+            self._volume_sum -= window[0]
+        window.append(volume)
+        self._volume_sum += volume
+        self.volume_avg_1min = self._volume_sum / len(window)
+
+    def update_volume_average_from_event(self, bar: LatestBar):
+        """Push one completed 1min bar's volume into the rolling average."""
         try:
-            # Process immediately - asyncio.create_task already ensures we're in a separate context
-            await self.process_trading_signal()
+            self._push_volume(float(bar.volume))
+            self.logger.debug("Updated volume average to %.2f", self.volume_avg_1min)
         except Exception as e:
-            self.logger.error(f"Error in signal processing task: {e}", exc_info=True)
+            self.logger.error("Error updating volume average from event: %s", e)
 
-    def update_volume_average_from_event(self, bar_data: dict):
-        """Update volume average from event data without fetching."""
-        try:
-            volume = bar_data.get("volume", 0)
-            # Simple moving average update (approximate)
-            if self.volume_avg_1min == 0:
-                self.volume_avg_1min = float(volume)
-            else:
-                # Exponential moving average for simplicity
-                alpha = 0.1  # Smoothing factor
-                self.volume_avg_1min = alpha * float(volume) + (1 - alpha) * self.volume_avg_1min
-            self.logger.debug(f"Updated volume average to {self.volume_avg_1min:.2f}")
-        except Exception as e:
-            self.logger.error(f"Error updating volume average from event: {e}")
-
-    async def update_volume_average(self):
-        """Legacy method - now uses cached data."""
-        try:
-            if not self.suite:
-                self.logger.error("TradingSuite not initialized, skipping volume average update")
-                return
-            # Try to use cached data first
-            if self.latest_bars.get("1min"):
-                bar_data = self.latest_bars["1min"].get("data", {})
-                self.update_volume_average_from_event(bar_data)
-                return
-
-            # Fallback to fetching (with timeout)
-            try:
-                data_1m = await asyncio.wait_for(
-                    self.suite.data.get_data("1min", bars=20),
-                    timeout=2.0
-                )
-                if data_1m is None:
-                    self.logger.error("No 1min data available")
-                    return
-
-                if not data_1m.is_empty() and len(data_1m) >= 20:
-                    volume_series = data_1m.select("volume").tail(20)
-                    if volume_series is not None and len(volume_series) > 0:
-                        mean_value = volume_series["volume"].mean()
-                        if isinstance(mean_value, int | float):
-                            self.volume_avg_1min = float(mean_value)
-                        else:
-                            self.volume_avg_1min = 0.0
-            except TimeoutError:
-                self.logger.error("Timeout fetching 1min data for volume average")
-        except Exception as e:
-            self.logger.error(f"Error updating volume average: {e}")
-
-    async def process_trading_signal_with_cached_data(self, bar_data: dict):
+    async def process_trading_signal_with_cached_data(self, bar: LatestBar):
         """Process trading signal using cached bar data from event."""
         try:
             self.logger.debug("Starting process_trading_signal_with_cached_data")
 
             # Quick volume check using cached data
-            current_volume = bar_data.get("volume", 0)
+            current_volume = bar.volume
 
             # Skip if no volume average established yet
             if self.volume_avg_1min <= 0:
@@ -247,11 +382,12 @@ class TrendMomentumXStrategy:
                 return
 
             # Check volume threshold
-            if current_volume < Config.VOLUME_THRESHOLD_PERCENT * self.volume_avg_1min:
-                self.logger.debug(f"Volume too low: {current_volume} < {Config.VOLUME_THRESHOLD_PERCENT * self.volume_avg_1min:.2f}")
+            threshold = self.volume_threshold_percent * self.volume_avg_1min
+            if current_volume < threshold:
+                self.logger.debug("Volume too low: %s < %.2f", current_volume, threshold)
                 return
 
-            self.logger.debug(f"Volume check passed: {current_volume} >= {Config.VOLUME_THRESHOLD_PERCENT * self.volume_avg_1min:.2f}")
+            self.logger.debug("Volume check passed: %s >= %.2f", current_volume, threshold)
 
             if not self.trend_analyzer:
                 self.logger.error("TrendAnalyzer not initialized, skipping")
@@ -264,7 +400,7 @@ class TrendMomentumXStrategy:
                     self.trend_analyzer.get_trade_mode(),
                     timeout=3.0
                 )
-                self.logger.debug(f"Trade mode: {trade_mode}")
+                self.logger.debug("Trade mode: %s", trade_mode)
             except TimeoutError:
                 self.logger.error("Timeout getting trade mode")
                 return
@@ -283,7 +419,7 @@ class TrendMomentumXStrategy:
             self.logger.debug("Finished process_trading_signal_with_cached_data")
 
         except Exception as e:
-            self.logger.error(f"Error in process_trading_signal_with_cached_data: {e}", exc_info=True)
+            self.logger.error("Error in process_trading_signal_with_cached_data: %s", e, exc_info=True)
 
     async def process_trading_signal(self):
         # The managed_trade context will handle pre-trade risk checks.
@@ -291,26 +427,29 @@ class TrendMomentumXStrategy:
         try:
             self.logger.debug("Starting process_trading_signal")
 
-            self.logger.debug("About to check volume filter")
-            volume_ok = await self.check_volume_filter()
-            self.logger.debug(f"Volume filter result: {volume_ok}")
+            if not self.trend_analyzer:
+                self.logger.error("TrendAnalyzer not initialized, skipping trade signal")
+                return
 
+            # Volume, trend and orderbook read independent data, so overlap their
+            # round-trips and gate on the results afterwards
+            self.logger.debug("Checking volume filter, trade mode and imbalance")
+            checks: list[Awaitable[Any]] = [
+                self.check_volume_filter(),
+                self.trend_analyzer.get_trade_mode(),
+            ]
             if self.orderbook_analyzer:
-                current_imbalance = await self.orderbook_analyzer.get_market_imbalance()
-                self.logger.debug(f"Current imbalance: {current_imbalance}")
+                checks.append(self.orderbook_analyzer.get_market_imbalance())
+            volume_ok, trade_mode, *imbalance = await asyncio.gather(*checks)
+            self.logger.debug("Volume filter result: %s", volume_ok)
+            self.logger.debug("Trade mode: %s", trade_mode)
+            if imbalance:
+                self.logger.debug("Current imbalance: %s", imbalance[0])
 
             if not volume_ok:
                 self.logger.debug("Volume filter check failed, skipping trade signal")
                 return
 
-            if not self.trend_analyzer:
-                self.logger.error("TrendAnalyzer not initialized, skipping trade signal")
-                return
-
-            self.logger.debug("Getting trade mode from trend analyzer")
-            trade_mode = await self.trend_analyzer.get_trade_mode()
-            self.logger.debug(f"Trade mode: {trade_mode}")
-
             if trade_mode == "no_trade":
                 self.logger.debug("Trade mode is no_trade, skipping")
                 return
@@ -325,16 +464,18 @@ class TrendMomentumXStrategy:
             self.logger.debug("Finished process_trading_signal")
 
         except Exception as e:
-            # Catch exceptions from managed_trade if risk limits are violated
-            self.logger.error(f"Could not process trade signal: {e}", exc_info=True)
-            raise  # Re-raise to be caught by the caller
+            # Catch exceptions from managed_trade if risk limits are violated. This
+            # runs as a detached task, so log here rather than re-raise into the void.
+            self.logger.error("Could not process trade signal: %s", e, exc_info=True)
+        finally:
+            self._signal_in_flight = False
 
     async def check_volume_filter(self) -> bool:
         try:
             self.logger.debug("check_volume_filter: Starting")
-            if not self.suite:
-                self.logger.error("TradingSuite not initialized, skipping volume filter check")
-                return False
+            # Only reached from process_trading_signal, whose analyzers exist only once
+            # initialize() has built the suite
+            assert self.suite is not None
 
             self.logger.debug("check_volume_filter: Getting 15sec data")
             data_15s = await self.suite.data.get_data("15sec", bars=1)
@@ -342,26 +483,28 @@ class TrendMomentumXStrategy:
             if data_15s is None:
                 self.logger.error("No 15sec data available")
                 return False
-            self.logger.debug(f"check_volume_filter: Got data, length={len(data_15s)}")
+            self.logger.debug("check_volume_filter: Got data, length=%d", len(data_15s))
 
             if data_15s.is_empty():
                 self.logger.debug("No data available for volume filter check")
                 return False
 
-            current_volume = data_15s.tail(1)["volume"][0]
-            self.logger.debug(f"check_volume_filter: current_volume={current_volume}, avg={self.volume_avg_1min}")
+            current_volume = data_15s["volume"].item(-1)
+            self.logger.debug(
+                "check_volume_filter: current_volume=%s, avg=%s", current_volume, self.volume_avg_1min
+            )
 
             # Require volume average to be established before trading
             if self.volume_avg_1min <= 0:
                 self.logger.debug("Volume average not established, skipping volume filter check")
                 return False
 
-            result = bool(current_volume >= Config.VOLUME_THRESHOLD_PERCENT * self.volume_avg_1min)
-            self.logger.debug(f"check_volume_filter: returning {result}")
+            result = bool(current_volume >= self.volume_threshold_percent * self.volume_avg_1min)
+            self.logger.debug("check_volume_filter: returning %s", result)
             return result
 
         except Exception as e:
-            self.logger.error(f"Error checking volume filter: {e}", exc_info=True)
+            self.logger.error("Error checking volume filter: %s", e, exc_info=True)
             return False
 
     async def check_long_entry(self):
@@ -373,7 +516,7 @@ class TrendMomentumXStrategy:
         if not signal_valid:
             return
 
-        self.logger.info(f"Long signal detected: {signal_details}")
+        self.logger.info("Long signal detected: %s", signal_details)
 
         if not self.orderbook_analyzer:
             self.logger.error("OrderBookAnalyzer not initialized, skipping long entry check")
@@ -381,7 +524,7 @@ class TrendMomentumXStrategy:
         orderbook_confirmed, orderbook_details = await self.orderbook_analyzer.confirm_long_entry()
 
         if not orderbook_confirmed:
-            self.logger.debug(f"Long signal rejected by orderbook: {orderbook_details['reason']}")
+            self.logger.debug("Long signal rejected by orderbook: %s", orderbook_details["reason"])
             return
 
         self.logger.info("Long entry confirmed by orderbook")
@@ -396,7 +539,7 @@ class TrendMomentumXStrategy:
         if not signal_valid:
             return
 
-        self.logger.info(f"Short signal detected: {signal_details}")
+        self.logger.info("Short signal detected: %s", signal_details)
 
         if not self.orderbook_analyzer:
             self.logger.error("OrderBookAnalyzer not initialized, skipping short entry check")
@@ -404,7 +547,7 @@ class TrendMomentumXStrategy:
         orderbook_confirmed, orderbook_details = await self.orderbook_analyzer.confirm_short_entry()
 
         if not orderbook_confirmed:
-            self.logger.debug(f"Short signal rejected by orderbook: {orderbook_details['reason']}")
+            self.logger.debug("Short signal rejected by orderbook: %s", orderbook_details["reason"])
             return
 
         self.logger.info("Short entry confirmed by orderbook")
@@ -426,8 +569,11 @@ class TrendMomentumXStrategy:
             target_price = self._calculate_target_price(current_price, stop_price, direction)
 
             self.logger.info(
-                f"Attempting to enter {direction} trade. "
-                f"Entry ~{current_price:.2f}, Stop={stop_price:.2f}, Target={target_price:.2f}"
+                "Attempting to enter %s trade. Entry ~%.2f, Stop=%.2f, Target=%.2f",
+                direction,
+                current_price,
+                stop_price,
+                target_price,
             )
 
             # 2. Use the managed_trade context for execution
@@ -440,46 +586,58 @@ class TrendMomentumXStrategy:
 
                 entry_order: Order | None = result.get("entry_order")
                 if entry_order and entry_order.id:
-                    entry_order_id = str(entry_order.id)
+                    entry_order_id = entry_order.id
                     self.logger.info(
-                        f"Managed trade submitted successfully. Entry Order ID: {entry_order_id}"
+                        "Managed trade submitted successfully. Entry Order ID: %s", entry_order_id
                     )
                     # Optional: Track the pending order if needed for other logic
-                    self.pending_orders[entry_order_id] = {
-                        "id": entry_order_id,
-                        "direction": direction,
-                        "entry_price": current_price,
-                        "stop_price": stop_price,
-                        "target_price": target_price,
-                        "status": "pending",
-                        "created_at": datetime.now(),
-                    }
+                    self._track_pending_order(
+                        PendingOrder(
+                            id=entry_order_id,
+                            direction=direction,
+                            entry_price=current_price,
+                            stop_price=stop_price,
+                            target_price=target_price,
+                            status=OrderStatus.PENDING,
+                            created_at=_now(),
+                        )
+                    )
                 else:
-                    self.logger.error(f"Managed trade failed to execute: {result}")
+                    self.logger.error("Managed trade failed to execute: %s", result)
 
         except Exception as e:
-            self.logger.error(f"Error entering managed trade: {e}", exc_info=True)
+            self.logger.error("Error entering managed trade: %s", e, exc_info=True)
+
+    def _track_pending_order(self, order: PendingOrder):
+        """Remember an entry order, evicting the oldest once the cap is reached."""
+        self.pending_orders[order.id] = order
+        if len(self.pending_orders) > MAX_PENDING_ORDERS:
+            self.pending_orders.popitem(last=False)
 
     async def on_order_filled(self, event: Event):
         order: Order = event.data
-        order_id = str(order.id)
+        order_id = order.id
+
+        # Our own fill just changed the book; don't confirm the next entry on a stale read
+        if self.orderbook_analyzer:
+            self.orderbook_analyzer.invalidate_cache()
 
         if order_id in self.pending_orders:
-            self.pending_orders[order_id]["status"] = "active"
-            self.logger.info(f"Entry order {order_id} filled at {order.filledPrice}")
+            self.pending_orders[order_id].status = OrderStatus.ACTIVE
+            self.logger.info("Entry order %s filled at %s", order_id, order.filledPrice)
         else:
             # This could be a stop-loss or take-profit fill
             self.logger.info(
-                f"Order {order_id} filled (likely SL/TP). Position will be closed by ExitManager."
+                "Order %s filled (likely SL/TP). Position will be closed by ExitManager.", order_id
             )
 
     async def on_order_failed(self, event: Event):
         order: Order = event.data
-        order_id = str(order.id)
+        order_id = order.id
         event_name = event.type.name if isinstance(event.type, EventType) else str(event.type)
 
         if order_id in self.pending_orders:
-            self.logger.warning(f"Entry order {order_id} failed with status: {event_name}")
+            self.logger.warning("Entry order %s failed with status: %s", order_id, event_name)
             # The managed_trade context handles its own state, but we can remove from our pending tracker.
             del self.pending_orders[order_id]
 
@@ -490,54 +648,61 @@ class TrendMomentumXStrategy:
         pnl = closed_position_data.get("profitAndLoss", 0.0)
         position_id = str(closed_position_data.get("positionId"))
 
-        self.logger.info(f"Position {position_id} closed with P&L: {pnl:.2f}")
+        self.logger.info("Position %s closed with P&L: %.2f", position_id, pnl)
         # The library's risk manager automatically tracks P&L. No manual update needed.
 
+    async def _heartbeat(self):
+        """Log a periodic status line while the strategy runs."""
+        check_count = 0
+        while self.running:
+            await asyncio.sleep(30)  # Log every 30 seconds
+            if self.running:
+                check_count += 1
+                # Check how long since last event
+                time_since_event = "Never"
+                if self.last_event_time_mono is not None:
+                    seconds_since = _monotonic() - self.last_event_time_mono
+                    time_since_event = f"{seconds_since:.0f}s ago"
+                self.logger.debug(
+                    "Strategy heartbeat - Running, volume_avg: %.2f, last event: %s",
+                    self.volume_avg_1min,
+                    time_since_event,
+                )
+
+                # Every minute, check if we can get data manually
+                if check_count % 2 == 0 and self.suite:
+                    try:
+                        data_15s = await self.suite.data.get_data("15sec", bars=1)
+                        if data_15s is not None and len(data_15s) > 0:
+                            last_close = data_15s["close"].item(-1)
+                            self.logger.debug("Manual data poll - 15sec close: %.2f", last_close)
+                        else:
+                            self.logger.warning("Heartbeat: No 15sec data available")
+                    except Exception as e:
+                        self.logger.error("Heartbeat data check error: %s", e)
+
     async def run(self):
         await self.initialize()
         self.running = True
 
-        self.logger.info(f"Strategy running in {Config.TRADING_MODE} mode")
+        self.logger.info("Strategy running in %s mode", Config.TRADING_MODE)
         self.logger.info("Press Ctrl+C to stop")
 
-        # Create a heartbeat task to log periodically
-        async def heartbeat():
-            check_count = 0
-            while self.running:
-                await asyncio.sleep(30)  # Log every 30 seconds
-                if self.running:
-                    check_count += 1
-                    # Check how long since last event
-                    time_since_event = "Never"
-                    if self.last_event_time:
-                        seconds_since = (datetime.now() - self.last_event_time).total_seconds()
-                        time_since_event = f"{seconds_since:.0f}s ago"
-                    self.logger.debug(f"Strategy heartbeat - Running, volume_avg: {self.volume_avg_1min:.2f}, last event: {time_since_event}")
-
-                    # Every minute, check if we can get data manually
-                    if check_count % 2 == 0 and self.suite:
-                        try:
-                            data_15s = await self.suite.data.get_data("15sec", bars=1)
-                            if data_15s is not None and len(data_15s) > 0:
-                                last_close = data_15s.tail(1)['close'][0]
-                                self.logger.debug(f"Manual data poll - 15sec close: {last_close:.2f}")
-                            else:
-                                self.logger.warning("Heartbeat: No 15sec data available")
-                        except Exception as e:
-                            self.logger.error(f"Heartbeat data check error: {e}")
-
-        heartbeat_task = asyncio.create_task(heartbeat())
+        # The heartbeat only feeds debug output; below DEBUG there is nothing to wake for
+        heartbeat_task = (
+            _create_task(self._heartbeat())
+            if self.logger.isEnabledFor(logging.DEBUG)
+            else None
+        )
 
         try:
-            # Keep the event loop active - don't just wait on stop_event
-            while self.running:
-                await asyncio.sleep(0.1)  # Yield control to event loop frequently
-                if self.stop_event.is_set():
-                    break
+            # Event handlers do the work; just park here until shutdown is requested
+            await self.stop_event.wait()
         except asyncio.CancelledError:
             self.logger.info("Strategy run cancelled")
         finally:
-            heartbeat_task.cancel()
+            if heartbeat_task:
+                heartbeat_task.cancel()
             await self.shutdown()
 
     async def shutdown(self):
@@ -547,17 +712,34 @@ class TrendMomentumXStrategy:
         self.running = False
         self.stop_event.set()
 
+        # Stop in-flight signal processing before positions are closed under it
+        tasks = [task for task in self._background_tasks if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.exit_manager:
+            await self.exit_manager.shutdown()
+
         active_positions = self.exit_manager.get_active_positions() if self.exit_manager else {}
         if active_positions:
-            self.logger.warning(f"Closing {len(active_positions)} active positions...")
+            self.logger.warning("Closing %d active positions...", len(active_positions))
             for position_id in active_positions:
                 try:
                     if self.suite:
                         await self.suite.orders.close_position(position_id)
                 except Exception as e:
-                    self.logger.error(f"Failed to close position {position_id}: {e}")
+                    self.logger.error("Failed to close position %s: %s", position_id, e)
 
         if self.suite:
+            try:
+                await asyncio.gather(
+                    *(
+                        self.suite.off(event_type, handler)
+                        for event_type, handler in self._subscriptions.items()
+                    )
+                )
+            except Exception as e:
+                self.logger.error("Failed to remove event subscriptions: %s", e)
             await self.suite.disconnect()
 
         self.logger.info("Strategy shutdown complete")
@@ -567,6 +749,7 @@ def create_signal_handler(strategy: "TrendMomentumXStrategy"):
     def signal_handler(sig: int, frame: Any) -> None:
         _ = sig, frame  # Unused
         print("\nReceived interrupt signal, shutting down...")
+        strategy.stop_event.set()  # Wake run() immediately
         asyncio.create_task(strategy.shutdown())
 
     return signal_handler
@@ -588,4 +771,9 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop
+    except ImportError:  # Not available on Windows; fall back to the stdlib loop
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -1,249 +1,542 @@
 import asyncio
 import logging
-from datetime import datetime, timedelta
+import time
+from collections.abc import Coroutine
+from dataclasses import dataclass, field
 from typing import Any
 
-from project_x_py import TradingSuite
-from project_x_py.indicators import SAR
+import polars as pl
+from project_x_py import EventType, TradingSuite
+from project_x_py.indicators.base import ema_alpha
 
 from utils import Config
 
+# Keys manage_position() needs from the incoming position dict
+POSITION_FIELDS = ("entry_price", "stop_price", "target_price", "direction", "size")
+
+
+@dataclass(slots=True)
+class StreamingSAR:
+    """Parabolic SAR advanced one bar at a time, same recurrence as the library's SAR indicator."""
+
+    acceleration: float
+    maximum: float
+    bars: int = 0
+    sar: float = 0.0
+    ep: float = 0.0
+    af: float = 0.0
+    uptrend: bool = True
+    prev_high: float = 0.0
+    prev_low: float = 0.0
+    prev2_high: float = 0.0
+    prev2_low: float = 0.0
+    last_ts: Any = None
+
+    def _next(self, high: float, low: float) -> tuple[float, float, float, bool]:
+        """Return (sar, ep, af, uptrend) for a bar following the state, without committing."""
+        if self.bars == 1:
+            return self.prev_low, high, self.acceleration, True
+
+        new_sar = self.sar + self.af * (self.ep - self.sar)
+        # The library clamps against one prior bar twice on the first step
+        prev2_high = self.prev2_high if self.bars > 2 else self.prev_high
+        prev2_low = self.prev2_low if self.bars > 2 else self.prev_low
+
+        if self.uptrend:
+            if low <= new_sar:
+                return self.ep, low, self.acceleration, False
+            ep, af = self.ep, self.af
+            if high > ep:
+                ep, af = high, min(af + self.acceleration, self.maximum)
+            return min(new_sar, self.prev_low, prev2_low), ep, af, True
+
+        if high >= new_sar:
+            return self.ep, high, self.acceleration, True
+        ep, af = self.ep, self.af
+        if low < ep:
+            ep, af = low, min(af + self.acceleration, self.maximum)
+        return max(new_sar, self.prev_high, prev2_high), ep, af, False
+
+    def update(self, high: float, low: float) -> None:
+        """Fold a completed bar into the state."""
+        if self.bars:
+            self.sar, self.ep, self.af, self.uptrend = self._next(high, low)
+        self.prev2_high, self.prev2_low = self.prev_high, self.prev_low
+        self.prev_high, self.prev_low = high, low
+        self.bars += 1
+
+    def peek(self, high: float, low: float) -> float | None:
+        """SAR for the bar still forming, leaving the state untouched."""
+        return self._next(high, low)[0] if self.bars else None
+
+
+@dataclass(slots=True)
+class StreamingMACD:
+    """MACD histogram advanced one bar at a time, matching the library's MACD indicator."""
+
+    fast_period: int
+    slow_period: int
+    signal_period: int
+    bars: int = 0
+    # Numerator/denominator of each EWM; carrying both reproduces Polars' bias-adjusted
+    # ewm_mean exactly instead of the plain recursive EMA
+    fast: tuple[float, float] = (0.0, 0.0)
+    slow: tuple[float, float] = (0.0, 0.0)
+    signal: tuple[float, float] = (0.0, 0.0)
+    last_ts: Any = None
+    _decays: tuple[float, float, float] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self._decays = (
+            1.0 - ema_alpha(self.fast_period),
+            1.0 - ema_alpha(self.slow_period),
+            1.0 - ema_alpha(self.signal_period),
+        )
+
+    def _next(
+        self, close: float
+    ) -> tuple[tuple[float, float], tuple[float, float], tuple[float, float], float]:
+        """Return (fast, slow, signal, histogram) after ``close``, without committing."""
+        fast_decay, slow_decay, signal_decay = self._decays
+        fast = (close + fast_decay * self.fast[0], 1.0 + fast_decay * self.fast[1])
+        slow = (close + slow_decay * self.slow[0], 1.0 + slow_decay * self.slow[1])
+        macd = fast[0] / fast[1] - slow[0] / slow[1]
+        signal = (macd + signal_decay * self.signal[0], 1.0 + signal_decay * self.signal[1])
+        return fast, slow, signal, macd - signal[0] / signal[1]
+
+    def update(self, close: float) -> None:
+        """Fold a completed bar into the state."""
+        self.fast, self.slow, self.signal, _ = self._next(close)
+        self.bars += 1
+
+    def peek(self, close: float) -> float:
+        """Histogram for the bar still forming, leaving the state untouched."""
+        return self._next(close)[3]
+
+
+@dataclass(slots=True)
+class PositionState:
+    """Exit-management state of one position, keyed by position id in ExitManager."""
+
+    entry_time_mono: float
+    entry_price: float
+    stop_price: float
+    target_price: float
+    direction: str
+    size: int
+    trailing_stop_activated: bool = False
+    breakeven_activated: bool = False
+    # Set once an exit is decided so later quotes don't send a second close while the
+    # first is in flight; cleared again if the close fails
+    exiting: bool = False
+    # +1 long, -1 short; derived from direction so callers never pass it
+    sign: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.sign = 1 if self.direction == "long" else -1
+
 
 class ExitManager:
     def __init__(self, suite: TradingSuite):
         self.suite = suite
         self.logger = logging.getLogger(__name__)
         self.time_exit_minutes = Config.TIME_EXIT_MINUTES
+        self._time_exit_seconds = self.time_exit_minutes * 60
         self.breakeven_trigger_ratio = Config.BREAKEVEN_TRIGGER_RATIO
         self.breakeven_offset_ticks = Config.BREAKEVEN_OFFSET_TICKS
         self.sar_af = Config.SAR_AF
         self.sar_max_af = Config.SAR_MAX_AF
         self.trailing_enabled = True
-        self.active_positions: dict[str, dict[str, Any]] = {}
+        # Shared across positions: SAR depends only on the instrument's 15sec bars
+        self._sar = StreamingSAR(self.sar_af, self.sar_max_af)
+        self._macd = StreamingMACD(fast_period=12, slow_period=26, signal_period=9)
+        self.active_positions: dict[str, PositionState] = {}
+        # Set by _exit_position to release the manage_position() call waiting on it
+        self._position_closed: dict[str, asyncio.Event] = {}
+        self._subscribed = False
+        # Guards exit/stop decisions only; order round-trips run outside it as tasks
+        self._lock = asyncio.Lock()
+        self._background_tasks: set[asyncio.Task] = set()
+        # Instrument is fixed for the suite's lifetime; resolve tick size and contract once
+        instrument = suite.instrument
+        self.tick_size: float | None = (
+            instrument.tickSize if instrument and hasattr(instrument, "tickSize") else None
+        )
+        self.contract_id = str(instrument.id) if instrument else "0"
+        self._breakeven_offset: float | None = (
+            self.breakeven_offset_ticks * self.tick_size if self.tick_size is not None else None
+        )
 
     async def manage_position(self, position: dict):
         position_id = position.get("id")
         if not position_id:
             return
 
-        self.active_positions[position_id] = {
-            "entry_time": datetime.now(),
-            "entry_price": position.get("entry_price"),
-            "stop_price": position.get("stop_price"),
-            "target_price": position.get("target_price"),
-            "direction": position.get("direction"),
-            "size": position.get("size"),
-            "trailing_stop_activated": False,
-            "breakeven_activated": False,
-        }
-
-        self.logger.debug(f"Managing position {position_id}: {position.get('direction')} @ {position.get('entry_price'):.2f}")
-        self.logger.debug(f"  Stop: {position.get('stop_price'):.2f}, Target: {position.get('target_price'):.2f}")
-
-        while position_id in self.active_positions:
-            exit_signal = await self._check_exit_conditions(position_id)
-
-            if exit_signal["should_exit"]:
-                self.logger.info(f"Exit signal for {position_id}: {exit_signal['reason']}")
-                await self._exit_position(position_id, exit_signal["reason"])
-                break
-
-            if (
-                self.trailing_enabled
-                and not self.active_positions[position_id]["trailing_stop_activated"]
-            ):
-                await self._check_trailing_activation(position_id)
+        # Fail here rather than on the first quote's float compare against a None level
+        missing = [key for key in POSITION_FIELDS if position.get(key) is None]
+        if missing:
+            self.logger.error(
+                "Cannot manage position %s: missing %s", position_id, ", ".join(missing)
+            )
+            return
 
-            if self.active_positions[position_id]["trailing_stop_activated"]:
-                await self._update_trailing_stop(position_id)
+        self.active_positions[position_id] = PositionState(
+            # Monotonic, so the time exit is a float compare and immune to clock changes
+            entry_time_mono=time.monotonic(),
+            entry_price=float(position["entry_price"]),
+            stop_price=float(position["stop_price"]),
+            target_price=float(position["target_price"]),
+            direction=str(position["direction"]),
+            size=int(position["size"]),
+        )
 
-            await asyncio.sleep(1)
+        self.logger.debug(
+            "Managing position %s: %s @ %.2f",
+            position_id,
+            position.get('direction'),
+            position.get('entry_price'),
+        )
+        self.logger.debug(
+            "  Stop: %.2f, Target: %.2f",
+            position.get('stop_price'),
+            position.get('target_price'),
+        )
 
-    async def _check_exit_conditions(self, position_id: str) -> dict:
+        # Exits are driven by quote and bar events; wait here until one closes the position
+        closed = self._position_closed[position_id] = asyncio.Event()
+        await self._subscribe()
+        try:
+            await closed.wait()
+        finally:
+            del self._position_closed[position_id]
+            if not self._position_closed:
+                await self._unsubscribe()
+
+    async def _subscribe(self):
+        if self._subscribed:
+            return
+        self._subscribed = True
+        # Bars kept arriving while nothing was managed; reseed rather than fold across the gap
+        self._sar = StreamingSAR(self.sar_af, self.sar_max_af)
+        self._macd = StreamingMACD(fast_period=12, slow_period=26, signal_period=9)
+        await asyncio.gather(
+            self.suite.on(EventType.QUOTE_UPDATE, self.on_quote_update),
+            self.suite.on(EventType.NEW_BAR, self.on_new_bar),
+        )
+
+    async def _unsubscribe(self):
+        if not self._subscribed:
+            return
+        self._subscribed = False
+        await asyncio.gather(
+            self.suite.off(EventType.QUOTE_UPDATE, self.on_quote_update),
+            self.suite.off(EventType.NEW_BAR, self.on_new_bar),
+        )
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        """Run a coroutine as a tracked background task."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def shutdown(self):
+        """Cancel in-flight exit and stop orders before the caller closes positions itself."""
+        tasks = list(self._background_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def on_quote_update(self, event: Any):
+        """Check price exits and trailing activation for every managed position."""
+        # Price the same way the data manager does: last trade, else the mid
+        quote = event.data
+        if quote.get("last") is not None:
+            current_price = float(quote["last"])
+        elif quote.get("bid") is not None and quote.get("ask") is not None:
+            current_price = (float(quote["bid"]) + float(quote["ask"])) / 2
+        else:
+            return
+        now = time.monotonic()
+
+        # The data manager awaits this handler before processing the tick, so only the
+        # decision happens here; closes and stop moves are handed off as tasks
+        async with self._lock:
+            for position_id in list(self._position_closed):
+                position = self.active_positions.get(position_id)
+                if not position or position.exiting:
+                    continue
+
+                exit_signal = await self._check_exit_conditions(position_id, current_price, now)
+                if exit_signal["should_exit"]:
+                    self.logger.info("Exit signal for %s: %s", position_id, exit_signal['reason'])
+                    position.exiting = True
+                    self._spawn(self._exit_position(position_id, exit_signal["reason"]))
+                    continue
+
+                if (
+                    self.trailing_enabled
+                    and not position.trailing_stop_activated
+                    and self._activate_trailing(position_id, position, current_price)
+                ):
+                    self._spawn(self._move_stop_to_breakeven(position_id))
+
+    async def on_new_bar(self, event: Any):
+        """Trail stops on 15sec bars and check for trend reversal on 5min bars."""
+        timeframe = event.data["timeframe"]
+        if timeframe not in ("15sec", "5min") or not self._position_closed:
+            return
+        # Bar data reads and any resulting orders run off the event bus
+        self._spawn(self._process_bar(timeframe))
+
+    async def _process_bar(self, timeframe: str):
+        # Indicators and price depend only on the instrument: read and advance them
+        # once per bar, then fan the result out to every position
+        if timeframe == "15sec":
+            # Advanced on every bar, trailing or not, so no bar is skipped
+            current_sar = await self._current_sar()
+            if current_sar is None or not any(
+                position.trailing_stop_activated for position in self.active_positions.values()
+            ):
+                return
+            current_price = await self.suite.data.get_current_price()
+            if not current_price:
+                return
+            async with self._lock:
+                for position_id in list(self._position_closed):
+                    position = self.active_positions.get(position_id)
+                    if (
+                        position
+                        and not position.exiting
+                        and position.trailing_stop_activated
+                        and self._should_trail(position, current_price, current_sar)
+                    ):
+                        self._spawn(
+                            self._update_trailing_stop(position_id, current_price, current_sar)
+                        )
+        else:
+            hist_last = await self._current_macd_histogram()
+            async with self._lock:
+                for position_id in list(self._position_closed):
+                    position = self.active_positions.get(position_id)
+                    if (
+                        position
+                        and not position.exiting
+                        and self._check_trend_reversal(position.direction, hist_last)
+                    ):
+                        self.logger.info("Exit signal for %s: Trend reversal detected", position_id)
+                        position.exiting = True
+                        self._spawn(self._exit_position(position_id, "Trend reversal detected"))
+
+    async def _check_exit_conditions(
+        self, position_id: str, current_price: float, now: float
+    ) -> dict:
         position = self.active_positions.get(position_id)
         if not position:
             return {"should_exit": False, "reason": ""}
 
-        current_price = await self.suite.data.get_current_price()
-        if not current_price:
-            return {"should_exit": False, "reason": ""}
-
-        # Check target and stop
-        if position["direction"] == "long":
-            pnl = current_price - position["entry_price"]
-            if current_price >= position["target_price"]:
-                self.logger.debug(f"Position {position_id}: Target reached ({current_price:.2f} >= {position['target_price']:.2f})")
-                return {"should_exit": True, "reason": "Target reached"}
-            if current_price <= position["stop_price"]:
-                self.logger.debug(f"Position {position_id}: Stop hit ({current_price:.2f} <= {position['stop_price']:.2f})")
-                return {"should_exit": True, "reason": "Stop loss hit"}
-        else:
-            pnl = position["entry_price"] - current_price
-            if current_price <= position["target_price"]:
-                self.logger.debug(f"Position {position_id}: Target reached ({current_price:.2f} <= {position['target_price']:.2f})")
-                return {"should_exit": True, "reason": "Target reached"}
-            if current_price >= position["stop_price"]:
-                self.logger.debug(f"Position {position_id}: Stop hit ({current_price:.2f} >= {position['stop_price']:.2f})")
-                return {"should_exit": True, "reason": "Stop loss hit"}
+        # sign folds the long/short mirror images into one comparison each:
+        # a positive signed move is in the position's favour
+        sign = position.sign
+        if sign * (current_price - position.target_price) >= 0:
+            self.logger.debug(
+                "Position %s: Target reached (%.2f vs target %.2f)",
+                position_id,
+                current_price,
+                position.target_price,
+            )
+            return {"should_exit": True, "reason": "Target reached"}
+        if sign * (current_price - position.stop_price) <= 0:
+            self.logger.debug(
+                "Position %s: Stop hit (%.2f vs stop %.2f)",
+                position_id,
+                current_price,
+                position.stop_price,
+            )
+            return {"should_exit": True, "reason": "Stop loss hit"}
 
         # Check time exit
-        time_elapsed = datetime.now() - position["entry_time"]
-        if time_elapsed > timedelta(minutes=self.time_exit_minutes):
-            entry_price = position["entry_price"]
-            if position["direction"] == "long":
-                if current_price <= entry_price:
-                    self.logger.debug(f"Position {position_id}: Time exit - no progress after {self.time_exit_minutes} min")
-                    return {"should_exit": True, "reason": "Time exit - no progress"}
-            else:
-                if current_price >= entry_price:
-                    self.logger.debug(f"Position {position_id}: Time exit - no progress after {self.time_exit_minutes} min")
-                    return {"should_exit": True, "reason": "Time exit - no progress"}
-
-        # Check trend reversal
-        trend_reversed = await self._check_trend_reversal(position["direction"])
-        if trend_reversed:
-            self.logger.debug(f"Position {position_id}: Trend reversal detected")
-            return {"should_exit": True, "reason": "Trend reversal detected"}
-
+        if (
+            now - position.entry_time_mono > self._time_exit_seconds
+            and sign * (current_price - position.entry_price) <= 0
+        ):
+            self.logger.debug(
+                "Position %s: Time exit - no progress after %s min",
+                position_id,
+                self.time_exit_minutes,
+            )
+            return {"should_exit": True, "reason": "Time exit - no progress"}
+
+        # Trend reversal only changes on 5min bars and is checked from on_new_bar
         return {"should_exit": False, "reason": ""}
 
-    async def _check_trend_reversal(self, position_direction: str) -> bool:
-        # Avoid circular import by directly checking trend here
+    async def _current_macd_histogram(self) -> float | None:
         data_5m = await self.suite.data.get_data("5min", bars=50)
         if data_5m is None or len(data_5m) < 35:  # Need enough for MACD calculation
+            return None
+
+        # As with SAR: fold each completed bar in once, then peek the forming bar
+        completed = data_5m.head(-1)
+        if self._macd.last_ts is not None:
+            completed = completed.filter(pl.col("timestamp") > self._macd.last_ts)
+        if len(completed):
+            for close in completed["close"]:
+                self._macd.update(close)
+            self._macd.last_ts = completed["timestamp"].item(-1)
+
+        hist_last = self._macd.peek(data_5m["close"].item(-1))
+        self.logger.debug("MACD Histogram for trend reversal check: %.4f", hist_last)
+        return hist_last
+
+    def _check_trend_reversal(self, position_direction: str, hist_last: float | None) -> bool:
+        if hist_last is None:
             return False
 
-        from project_x_py.indicators import MACD
-
-        data_5m = data_5m.pipe(MACD, fast_period=12, slow_period=26, signal_period=9)
-
-        hist_last = data_5m.tail(1)["macd_histogram"][0]
-        self.logger.debug(f"MACD Histogram for trend reversal check: {hist_last:.4f}")
-
         reversal = (
             position_direction == "long" and hist_last < -0.01
             or position_direction == "short" and hist_last > 0.01
         )
 
         if reversal:
-            self.logger.debug(f"Trend reversal confirmed: {position_direction} position with MACD hist={hist_last:.4f}")
+            self.logger.debug(
+                "Trend reversal confirmed: %s position with MACD hist=%.4f",
+                position_direction,
+                hist_last,
+            )
 
         return reversal
 
-    async def _check_trailing_activation(self, position_id: str):
-        position = self.active_positions.get(position_id)
-        if not position:
-            return
+    def _activate_trailing(
+        self, position_id: str, position: PositionState, current_price: float
+    ) -> bool:
+        """Activate trailing once profit reaches the breakeven trigger.
 
-        current_price = await self.suite.data.get_current_price()
-        if not current_price:
-            return
-
-        entry_price = position["entry_price"]
-        stop_price = position["stop_price"]
-        risk_amount = abs(entry_price - stop_price)
+        Returns True when the stop still has to be moved to breakeven.
+        """
+        risk_amount = abs(position.entry_price - position.stop_price)
         breakeven_trigger = risk_amount * self.breakeven_trigger_ratio
 
-        if position["direction"] == "long":
-            profit = current_price - entry_price
-            if current_price >= entry_price + breakeven_trigger:
-                self.logger.debug(f"Position {position_id}: Profit {profit:.2f} >= trigger {breakeven_trigger:.2f}")
-                if not position["breakeven_activated"]:
-                    self.logger.info(f"Position {position_id}: Moving stop to breakeven")
-                    await self._move_stop_to_breakeven(position_id)
-                position["trailing_stop_activated"] = True
-                self.logger.debug(f"Position {position_id}: Trailing stop activated")
-        else:
-            profit = entry_price - current_price
-            if current_price <= entry_price - breakeven_trigger:
-                self.logger.debug(f"Position {position_id}: Profit {profit:.2f} >= trigger {breakeven_trigger:.2f}")
-                if not position["breakeven_activated"]:
-                    self.logger.info(f"Position {position_id}: Moving stop to breakeven")
-                    await self._move_stop_to_breakeven(position_id)
-                position["trailing_stop_activated"] = True
-                self.logger.debug(f"Position {position_id}: Trailing stop activated")
+        profit = position.sign * (current_price - position.entry_price)
+        if profit < breakeven_trigger:
+            return False
+
+        self.logger.debug(
+            "Position %s: Profit %.2f >= trigger %.2f",
+            position_id,
+            profit,
+            breakeven_trigger,
+        )
+        position.trailing_stop_activated = True
+        self.logger.debug("Position %s: Trailing stop activated", position_id)
+        if position.breakeven_activated:
+            return False
+        self.logger.info("Position %s: Moving stop to breakeven", position_id)
+        return True
+
+    async def _check_trailing_activation(self, position_id: str, current_price: float):
+        position = self.active_positions.get(position_id)
+        if position and self._activate_trailing(position_id, position, current_price):
+            await self._move_stop_to_breakeven(position_id)
 
     async def _move_stop_to_breakeven(self, position_id: str):
         position = self.active_positions.get(position_id)
         if not position:
             return
 
-        instrument = self.suite.instrument
-        if not instrument or not hasattr(instrument, "tickSize"):
+        if self._breakeven_offset is None:
             return
 
-        tick_size = instrument.tickSize
-        offset = self.breakeven_offset_ticks * tick_size
-
-        entry_price = position["entry_price"]
-
-        new_stop = entry_price + offset if position["direction"] == "long" else entry_price - offset
+        new_stop = position.entry_price + position.sign * self._breakeven_offset
 
         try:
             # Modify stop loss order
             await self.suite.orders.modify_order(position_id, stop_loss_price=new_stop)
-            position["stop_price"] = new_stop
-            position["breakeven_activated"] = True
-            self.logger.info(f"Moved stop to breakeven for {position_id} at {new_stop:.2f}")
+            position.stop_price = new_stop
+            position.breakeven_activated = True
+            self.logger.info("Moved stop to breakeven for %s at %.2f", position_id, new_stop)
         except Exception as e:
             # Fallback: try to cancel and replace the order if modify isn't supported
             try:
                 await self.suite.orders.cancel_order(position_id + "_stop")
                 await self.suite.orders.place_stop_order(
-                    contract_id=str(self.suite.instrument.id) if self.suite.instrument else "0",
-                    side=1 if position["direction"] == "long" else 0,  # Opposite side for stop
-                    size=position["size"],
+                    contract_id=self.contract_id,
+                    side=1 if position.sign > 0 else 0,  # Opposite side for stop
+                    size=position.size,
                     stop_price=new_stop,
                 )
-                position["stop_price"] = new_stop
-                position["breakeven_activated"] = True
-                self.logger.info(f"Moved stop to breakeven (fallback) for {position_id} at {new_stop:.2f}")
+                position.stop_price = new_stop
+                position.breakeven_activated = True
+                self.logger.info(
+                    "Moved stop to breakeven (fallback) for %s at %.2f",
+                    position_id,
+                    new_stop,
+                )
             except Exception as e2:
-                self.logger.error(f"Failed to move stop to breakeven: {e} | Fallback failed: {e2}")
-
-    async def _update_trailing_stop(self, position_id: str):
-        position = self.active_positions.get(position_id)
-        if not position:
-            return
+                self.logger.error(
+                    "Failed to move stop to breakeven: %s | Fallback failed: %s",
+                    e,
+                    e2,
+                )
 
+    async def _current_sar(self) -> float | None:
         data_15s = await self.suite.data.get_data("15sec", bars=20)
         if data_15s is None or len(data_15s) < 10:
+            return None
+
+        # The last row is the bar still forming; fold in only completed bars not seen
+        # yet, so each call costs O(new bars) instead of re-running SAR over the window
+        completed = data_15s.head(-1)
+        if self._sar.last_ts is not None:
+            completed = completed.filter(pl.col("timestamp") > self._sar.last_ts)
+        if len(completed):
+            for high, low in zip(completed["high"], completed["low"], strict=True):
+                self._sar.update(high, low)
+            self._sar.last_ts = completed["timestamp"].item(-1)
+
+        return self._sar.peek(data_15s["high"].item(-1), data_15s["low"].item(-1))
+
+    async def _update_trailing_stop(
+        self, position_id: str, current_price: float, current_sar: float
+    ):
+        position = self.active_positions.get(position_id)
+        if not position or not self._should_trail(position, current_price, current_sar):
             return
 
-        # SAR indicator - uses configured parameters
-        data_15s = data_15s.pipe(SAR, acceleration=self.sar_af, maximum=self.sar_max_af)
-        current_sar = data_15s.tail(1)["SAR"][0]
-
-        current_price = await self.suite.data.get_current_price()
-        if not current_price:
-            return
-
-        if position["direction"] == "long":
-            if current_sar > position["stop_price"] and current_sar < current_price:
-                old_stop = position["stop_price"]
-                try:
-                    await self.suite.orders.modify_order(position_id, stop_loss_price=current_sar)
-                    position["stop_price"] = current_sar
-                    self.logger.debug(f"Position {position_id}: Trailing stop updated {old_stop:.2f} -> {current_sar:.2f}")
-                except Exception as e:
-                    self.logger.error(f"Failed to update trailing stop: {e}")
-        else:
-            if current_sar < position["stop_price"] and current_sar > current_price:
-                old_stop = position["stop_price"]
-                try:
-                    await self.suite.orders.modify_order(position_id, stop_loss_price=current_sar)
-                    position["stop_price"] = current_sar
-                    self.logger.debug(f"Position {position_id}: Trailing stop updated {old_stop:.2f} -> {current_sar:.2f}")
-                except Exception as e:
-                    self.logger.error(f"Failed to update trailing stop: {e}")
+        old_stop = position.stop_price
+        try:
+            await self.suite.orders.modify_order(position_id, stop_loss_price=current_sar)
+            position.stop_price = current_sar
+            self.logger.debug(
+                "Position %s: Trailing stop updated %.2f -> %.2f",
+                position_id,
+                old_stop,
+                current_sar,
+            )
+        except Exception as e:
+            self.logger.error("Failed to update trailing stop: %s", e)
+
+    @staticmethod
+    def _should_trail(position: PositionState, current_price: float, current_sar: float) -> bool:
+        # Trail only toward profit, and only while SAR is still on the losing side of price
+        sign = position.sign
+        return (
+            sign * (current_sar - position.stop_price) > 0
+            and sign * (current_price - current_sar) > 0
+        )
 
     async def _exit_position(self, position_id: str, reason: str):
         try:
             await self.suite.orders.close_position(position_id)
-            self.logger.info(f"Position {position_id} closed: {reason}")
+            self.logger.info("Position %s closed: %s", position_id, reason)
             del self.active_positions[position_id]
+            closed = self._position_closed.get(position_id)
+            if closed:
+                closed.set()
         except Exception as e:
-            self.logger.error(f"Failed to close position {position_id}: {e}")
+            self.logger.error("Failed to close position %s: %s", position_id, e)
+            # Let the next quote or bar retry the exit
+            position = self.active_positions.get(position_id)
+            if position:
+                position.exiting = False
 
-    def get_active_positions(self) -> dict:
+    def get_active_positions(self) -> dict[str, PositionState]:
         return self.active_positions
@@ -1,10 +1,16 @@
+import asyncio
 import logging
+import time
 from typing import Any
 
 from project_x_py import TradingSuite
 
 from utils import Config
 
+# Orderbook reads are reused for this long; process_trading_signal reads the imbalance
+# and the entry confirmation reads it again moments later for the same market
+ORDERBOOK_CACHE_TTL = 0.25
+
 
 class OrderBookAnalyzer:
     def __init__(self, suite: TradingSuite):
@@ -14,8 +20,24 @@ class OrderBookAnalyzer:
         self.imbalance_short_threshold = Config.IMBALANCE_SHORT_THRESHOLD
         self.iceberg_check_enabled = Config.ICEBERG_CHECK
         self.depth_levels = Config.IMBALANCE_DEPTH_LEVELS
+        # (monotonic fetch time, result) of the last read of each orderbook query
+        self._imbalance_cache: tuple[float, float | None] | None = None
+        self._iceberg_cache: tuple[float, list[dict[str, Any]]] | None = None
+
+    def invalidate_cache(self) -> None:
+        """Force the next imbalance and iceberg reads to go to the orderbook."""
+        self._imbalance_cache = None
+        self._iceberg_cache = None
 
     async def get_market_imbalance(self) -> float | None:
+        now = time.monotonic()
+        if self._imbalance_cache and now - self._imbalance_cache[0] < ORDERBOOK_CACHE_TTL:
+            return self._imbalance_cache[1]
+        imbalance = await self._fetch_market_imbalance()
+        self._imbalance_cache = (now, imbalance)
+        return imbalance
+
+    async def _fetch_market_imbalance(self) -> float | None:
         if not hasattr(self.suite, 'orderbook') or self.suite.orderbook is None:
             self.logger.debug("OrderBook not available")
             return None
@@ -33,6 +55,14 @@ class OrderBookAnalyzer:
             return None
 
     async def detect_icebergs(self) -> list[dict[str, Any]]:
+        now = time.monotonic()
+        if self._iceberg_cache and now - self._iceberg_cache[0] < ORDERBOOK_CACHE_TTL:
+            return self._iceberg_cache[1]
+        icebergs = await self._fetch_icebergs()
+        self._iceberg_cache = (now, icebergs)
+        return icebergs
+
+    async def _fetch_icebergs(self) -> list[dict[str, Any]]:
         if not hasattr(self.suite, 'orderbook') or self.suite.orderbook is None:
             self.logger.debug("OrderBook not available for iceberg detection")
             return []
@@ -63,8 +93,15 @@ class OrderBookAnalyzer:
             "reason": ""
         }
 
+        # Query icebergs alongside the imbalance so a passing imbalance doesn't pay a
+        # second round-trip; the iceberg read is dropped if the imbalance rejects
+        iceberg_task = (
+            asyncio.create_task(self.detect_icebergs()) if self.iceberg_check_enabled else None
+        )
         imbalance = await self.get_market_imbalance()
         if imbalance is None:
+            if iceberg_task:
+                iceberg_task.cancel()
             confirmation["reason"] = "OrderBook data unavailable"
             self.logger.debug(f"  ❌ {confirmation['reason']}")
             return False, confirmation
@@ -74,13 +111,15 @@ class OrderBookAnalyzer:
         # For long entry, we want bid volume > ask volume (imbalance > threshold)
         self.logger.debug(f"  Imbalance: {imbalance:.4f} (threshold: >{self.imbalance_long_threshold})")
         if imbalance < self.imbalance_long_threshold:
+            if iceberg_task:
+                iceberg_task.cancel()
             confirmation["reason"] = f"Insufficient bid imbalance: {imbalance:.2f} < {self.imbalance_long_threshold}"
             self.logger.debug(f"  ❌ {confirmation['reason']}")
             return False, confirmation
         self.logger.debug("  ✓ Bid imbalance sufficient")
 
-        if self.iceberg_check_enabled:
-            icebergs = await self.detect_icebergs()
+        if iceberg_task:
+            icebergs = await iceberg_task
             confirmation["icebergs"] = icebergs
 
             ask_icebergs = [ice for ice in icebergs if ice.get('side') == 'ask']
@@ -106,8 +145,15 @@ class OrderBookAnalyzer:
             "reason": ""
         }
 
+        # Query icebergs alongside the imbalance so a passing imbalance doesn't pay a
+        # second round-trip; the iceberg read is dropped if the imbalance rejects
+        iceberg_task = (
+            asyncio.create_task(self.detect_icebergs()) if self.iceberg_check_enabled else None
+        )
         imbalance = await self.get_market_imbalance()
         if imbalance is None:
+            if iceberg_task:
+                iceberg_task.cancel()
             confirmation["reason"] = "OrderBook data unavailable"
             self.logger.debug(f"  ❌ {confirmation['reason']}")
             return False, confirmation
@@ -117,13 +163,15 @@ class OrderBookAnalyzer:
         # For short entry, we want ask volume > bid volume (imbalance < threshold)
         self.logger.debug(f"  Imbalance: {imbalance:.4f} (threshold: <{self.imbalance_short_threshold})")
         if imbalance > self.imbalance_short_threshold:
+            if iceberg_task:
+                iceberg_task.cancel()
             confirmation["reason"] = f"Insufficient ask imbalance: {imbalance:.2f} > {self.imbalance_short_threshold}"
             self.logger.debug(f"  ❌ {confirmation['reason']}")
             return False, confirmation
         self.logger.debug("  ✓ Ask imbalance sufficient")
 
-        if self.iceberg_check_enabled:
-            icebergs = await self.detect_icebergs()
+        if iceberg_task:
+            icebergs = await iceberg_task
             confirmation["icebergs"] = icebergs
 
             bid_icebergs = [ice for ice in icebergs if ice.get('side') == 'bid']
@@ -148,10 +196,10 @@ class OrderBookAnalyzer:
             if not snapshot:
                 return {"bid_pressure": 0, "ask_pressure": 0, "net_pressure": 0}
 
-            # Calculate volumes from snapshot
-            # bids and asks are lists of PriceLevelDict with 'price' and 'volume' keys
-            bid_volume = sum(level["volume"] for level in snapshot.get("bids", []))
-            ask_volume = sum(level["volume"] for level in snapshot.get("asks", []))
+            # The snapshot already carries each side's volume, summed columnar over the
+            # same levels, so there's no need to walk the per-level dicts again
+            bid_volume = snapshot["total_bid_volume"]
+            ask_volume = snapshot["total_ask_volume"]
 
             total_volume = bid_volume + ask_volume
             if total_volume == 0:
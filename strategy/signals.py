@@ -54,7 +54,15 @@ class SignalGenerator:
         deadzone = last_wae["wae_dead_zone"][0]
         signals["wae_explosion"] = explosion > deadzone and trend > 0
         self.logger.debug(
-            f"WAE: explosion={explosion:.4f}, trend={trend:.4f}, deadzone={deadzone:.4f}"
+            f"WAE: explosion={explosion:.4f}, trend={trend:.4f}, deadzone={deadzone:.4f}",
+            extra={
+                "event": {
+                    "evt": "WAE",
+                    "explosion": float(explosion),
+                    "trend": float(trend),
+                    "deadzone": float(deadzone),
+                }
+            },
         )
         self.logger.debug(f"  ✓ WAE Explosion Signal: {signals['wae_explosion']}")
 
@@ -63,11 +71,20 @@ class SignalGenerator:
         prev_high = last_two_rows["high"][0]
         current_close = last_two_rows["close"][1]
         signals["price_break"] = current_close > prev_high
-        self.logger.debug(f"Price: close={current_close:.2f}, prev_high={prev_high:.2f}")
+        self.logger.debug(
+            f"Price: close={current_close:.2f}, prev_high={prev_high:.2f}",
+            extra={
+                "event": {
+                    "evt": "PRICE",
+                    "close": float(current_close),
+                    "prev_high": float(prev_high),
+                }
+            },
+        )
         self.logger.debug(f"  ✓ Price Break Signal: {signals['price_break']}")
 
         # Check patterns (OB/FVG) - now critical
-        signals["pattern_edge"] = await self._check_bullish_pattern()
+        signals["pattern_edge"] = await self._check_bullish_pattern(current_close)
         self.logger.debug(f"  ✓ Pattern Edge Signal (REQUIRED): {signals['pattern_edge']}")
 
         signals["details"] = {
@@ -152,7 +169,15 @@ class SignalGenerator:
         deadzone = last_wae["wae_dead_zone"][0]
         signals["wae_explosion"] = explosion > deadzone and trend < 0
         self.logger.debug(
-            f"WAE: explosion={explosion:.4f}, trend={trend:.4f}, deadzone={deadzone:.4f}"
+            f"WAE: explosion={explosion:.4f}, trend={trend:.4f}, deadzone={deadzone:.4f}",
+            extra={
+                "event": {
+                    "evt": "WAE",
+                    "explosion": float(explosion),
+                    "trend": float(trend),
+                    "deadzone": float(deadzone),
+                }
+            },
         )
         self.logger.debug(f"  ✓ WAE Explosion Signal: {signals['wae_explosion']}")
 
@@ -161,11 +186,20 @@ class SignalGenerator:
         prev_low = last_two_rows["low"][0]
         current_close = last_two_rows["close"][1]
         signals["price_break"] = current_close < prev_low
-        self.logger.debug(f"Price: close={current_close:.2f}, prev_low={prev_low:.2f}")
+        self.logger.debug(
+            f"Price: close={current_close:.2f}, prev_low={prev_low:.2f}",
+            extra={
+                "event": {
+                    "evt": "PRICE",
+                    "close": float(current_close),
+                    "prev_low": float(prev_low),
+                }
+            },
+        )
         self.logger.debug(f"  ✓ Price Break Signal: {signals['price_break']}")
 
         # Check patterns (OB/FVG) - now critical
-        signals["pattern_edge"] = await self._check_bearish_pattern()
+        signals["pattern_edge"] = await self._check_bearish_pattern(current_close)
         self.logger.debug(f"  ✓ Pattern Edge Signal (REQUIRED): {signals['pattern_edge']}")
 
         signals["details"] = {
@@ -223,7 +257,7 @@ class SignalGenerator:
 
         return all_signals, signals
 
-    async def _check_bullish_pattern(self) -> bool:
+    async def _check_bullish_pattern(self, current_price: float) -> bool:
         data_5m = await self.suite.data.get_data("5min", bars=120)
         if data_5m is None or len(data_5m) < 120:
             self.logger.debug("  Pattern check: Insufficient 5min data")
@@ -233,19 +267,11 @@ class SignalGenerator:
             ORDERBLOCK, min_volume_percentile=self.ob_volume_percentile
         )
 
-        last_row = data_5m.tail(1)
-        data_15s = await self.suite.data.get_data("15sec")
-        if data_15s is None:
-            return False
-        current_price = data_15s.tail(1)["close"][0]
-
+        # One dict for the last bar instead of a single-element Series per column
+        last_row = data_5m.row(-1, named=True)
         has_bullish_ob = False
-        if (
-            "ob_bullish" in last_row.columns
-            and last_row["ob_bullish"][0]
-            and "ob_bottom" in last_row.columns
-        ):
-            ob_bottom = last_row["ob_bottom"][0]
+        if last_row.get("ob_bullish") and "ob_bottom" in last_row:
+            ob_bottom = last_row["ob_bottom"]
             if ob_bottom is not None:
                 has_bullish_ob = current_price >= ob_bottom
                 self.logger.debug(
@@ -253,10 +279,10 @@ class SignalGenerator:
                 )
 
         has_fvg_fill = False
-        if "fvg_bullish" in last_row.columns and last_row["fvg_bullish"][0]:
+        if last_row.get("fvg_bullish"):
             has_fvg_fill = True
-            if "fvg_gap_bottom" in last_row.columns:
-                gap_bottom = last_row["fvg_gap_bottom"][0]
+            if "fvg_gap_bottom" in last_row:
+                gap_bottom = last_row["fvg_gap_bottom"]
                 if gap_bottom is not None:
                     self.logger.debug(f"  Bullish FVG: Found with bottom at {gap_bottom:.2f}")
                 else:
@@ -264,11 +290,12 @@ class SignalGenerator:
 
         result = has_bullish_ob or has_fvg_fill
         self.logger.debug(
-            f"  Pattern result: OB={has_bullish_ob}, FVG={has_fvg_fill}, Final={result}"
+            f"  Pattern result: OB={has_bullish_ob}, FVG={has_fvg_fill}, Final={result}",
+            extra={"event": {"evt": "PATTERN", "ob": bool(has_bullish_ob), "fvg": bool(has_fvg_fill)}},
         )
         return result
 
-    async def _check_bearish_pattern(self) -> bool:
+    async def _check_bearish_pattern(self, current_price: float) -> bool:
         data_5m = await self.suite.data.get_data("5min", bars=120)
         if data_5m is None or len(data_5m) < 120:
             self.logger.debug("  Pattern check: Insufficient 5min data")
@@ -278,19 +305,11 @@ class SignalGenerator:
             ORDERBLOCK, min_volume_percentile=self.ob_volume_percentile
         )
 
-        last_row = data_5m.tail(1)
-        data_15s = await self.suite.data.get_data("15sec")
-        if data_15s is None:
-            return False
-        current_price = data_15s.tail(1)["close"][0]
-
+        # One dict for the last bar instead of a single-element Series per column
+        last_row = data_5m.row(-1, named=True)
         has_bearish_ob = False
-        if (
-            "ob_bearish" in last_row.columns
-            and last_row["ob_bearish"][0]
-            and "ob_top" in last_row.columns
-        ):
-            ob_top = last_row["ob_top"][0]
+        if last_row.get("ob_bearish") and "ob_top" in last_row:
+            ob_top = last_row["ob_top"]
             if ob_top is not None:
                 has_bearish_ob = current_price <= ob_top
                 self.logger.debug(
@@ -298,10 +317,10 @@ class SignalGenerator:
                 )
 
         has_fvg_fill = False
-        if "fvg_bearish" in last_row.columns and last_row["fvg_bearish"][0]:
+        if last_row.get("fvg_bearish"):
             has_fvg_fill = True
-            if "fvg_gap_top" in last_row.columns:
-                gap_top = last_row["fvg_gap_top"][0]
+            if "fvg_gap_top" in last_row:
+                gap_top = last_row["fvg_gap_top"]
                 if gap_top is not None:
                     self.logger.debug(f"  Bearish FVG: Found with top at {gap_top:.2f}")
                 else:
@@ -309,7 +328,8 @@ class SignalGenerator:
 
         result = has_bearish_ob or has_fvg_fill
         self.logger.debug(
-            f"  Pattern result: OB={has_bearish_ob}, FVG={has_fvg_fill}, Final={result}"
+            f"  Pattern result: OB={has_bearish_ob}, FVG={has_fvg_fill}, Final={result}",
+            extra={"event": {"evt": "PATTERN", "ob": bool(has_bearish_ob), "fvg": bool(has_fvg_fill)}},
         )
         return result
 
@@ -3,7 +3,8 @@ from typing import Literal
 
 import polars as pl
 from project_x_py import TradingSuite
-from project_x_py.indicators import EMA, MACD, WAE
+from project_x_py.indicators import MACD, WAE
+from project_x_py.indicators.base import ema_alpha
 
 from utils import Config
 
@@ -31,9 +32,12 @@ class TrendAnalyzer:
             self.logger.debug(f"15min: Not enough data (got {len(data)} bars, need {self.ema_slow})")
             return "neutral"
 
-        data = (data
-                .pipe(EMA, period=self.ema_fast)
-                .pipe(EMA, period=self.ema_slow))
+        # Both EMAs in one with_columns so the frame is copied once, not once per pipe
+        close = pl.col("close")
+        data = data.with_columns(
+            close.ewm_mean(alpha=ema_alpha(self.ema_fast)).alias(f"ema_{self.ema_fast}"),
+            close.ewm_mean(alpha=ema_alpha(self.ema_slow)).alias(f"ema_{self.ema_slow}"),
+        )
 
         last_row = data.tail(1)
         ema50 = last_row["ema_50"][0]
@@ -137,13 +141,22 @@ class TrendAnalyzer:
 
         # Primary trend (15min) must be aligned, plus at least one other
         if trend_15m == "bullish" and bullish_count >= 2:
-            self.logger.debug(f"TRADE MODE: LONG_ONLY (15min bullish + {bullish_count} bullish trends)")
+            self.logger.debug(
+                f"TRADE MODE: LONG_ONLY (15min bullish + {bullish_count} bullish trends)",
+                extra={"event": {"evt": "TRADE_MODE", "mode": "long_only"}},
+            )
             return "long_only"
         elif trend_15m == "bearish" and bearish_count >= 2:
-            self.logger.debug(f"TRADE MODE: SHORT_ONLY (15min bearish + {bearish_count} bearish trends)")
+            self.logger.debug(
+                f"TRADE MODE: SHORT_ONLY (15min bearish + {bearish_count} bearish trends)",
+                extra={"event": {"evt": "TRADE_MODE", "mode": "short_only"}},
+            )
             return "short_only"
         else:
-            self.logger.debug("TRADE MODE: NO_TRADE (insufficient alignment)")
+            self.logger.debug(
+                "TRADE MODE: NO_TRADE (insufficient alignment)",
+                extra={"event": {"evt": "TRADE_MODE", "mode": "no_trade"}},
+            )
             return "no_trade"
 
     async def get_trend_details(self) -> dict:
@@ -1,12 +1,35 @@
 """Unit tests for the exits module."""
 
 import asyncio
+import time
+from dataclasses import replace
 from datetime import datetime, timedelta
+from typing import Any
+from unittest.mock import Mock
 
 import polars as pl
 import pytest
 
-from strategy.exits import ExitManager
+from strategy.exits import ExitManager, PositionState
+
+
+def make_position(**overrides: Any) -> PositionState:
+    """Build a long position with the stop/target levels the tests use."""
+    position = PositionState(
+        entry_time_mono=time.monotonic(),
+        entry_price=5000.0,
+        stop_price=4995.0,
+        target_price=5010.0,
+        direction="long",
+        size=2,
+    )
+    return replace(position, **overrides)
+
+
+async def drain(manager: ExitManager) -> None:
+    """Wait for the order tasks the event handlers handed off, including ones they spawn."""
+    while manager._background_tasks:
+        await asyncio.gather(*manager._background_tasks)
 
 
 class TestExitManager:
@@ -21,13 +44,13 @@ class TestExitManager:
         assert manager.breakeven_trigger_ratio == 1.0
         assert manager.breakeven_offset_ticks == 5
         assert manager.trailing_enabled is True
+        assert manager.contract_id == "ES"
         assert len(manager.active_positions) == 0
 
     @pytest.mark.asyncio
     async def test_manage_position_adds_to_active(self, mock_suite):
         """Test that manage_position adds position to active positions."""
         manager = ExitManager(mock_suite)
-        mock_suite.data.get_current_price.return_value = 5000.0
 
         position = {
             "id": "POS123",
@@ -43,7 +66,7 @@ class TestExitManager:
         await asyncio.sleep(0.1)  # Let it initialize
 
         assert "POS123" in manager.active_positions
-        assert manager.active_positions["POS123"]["entry_price"] == 5000.0
+        assert manager.active_positions["POS123"].entry_price == 5000.0
 
         # Cancel the task
         task.cancel()
@@ -53,13 +76,28 @@ class TestExitManager:
             pass
 
     @pytest.mark.asyncio
-    async def test_check_exit_conditions_target_reached_long(self, mock_suite):
-        """Test exit condition when target is reached for long position."""
+    async def test_manage_position_rejects_missing_levels(self, mock_suite):
+        """Test that a position without a stop price is not managed."""
         manager = ExitManager(mock_suite)
-        mock_suite.data.get_current_price.return_value = 5010.0
+        position = {
+            "id": "POS123",
+            "entry_price": 5000.0,
+            "target_price": 5010.0,
+            "direction": "long",
+            "size": 2
+        }
+
+        await asyncio.wait_for(manager.manage_position(position), timeout=1)
+
+        assert "POS123" not in manager.active_positions
+        mock_suite.on.assert_not_awaited()
 
-        manager.active_positions["POS123"] = {
-            "entry_time": datetime.now(),
+    @pytest.mark.asyncio
+    async def test_quote_update_exits_managed_position(self, mock_suite):
+        """Test that a quote through the target closes the position and ends management."""
+        manager = ExitManager(mock_suite)
+        position = {
+            "id": "POS123",
             "entry_price": 5000.0,
             "stop_price": 4995.0,
             "target_price": 5010.0,
@@ -67,7 +105,50 @@ class TestExitManager:
             "size": 2
         }
 
-        result = await manager._check_exit_conditions("POS123")
+        task = asyncio.create_task(manager.manage_position(position))
+        await asyncio.sleep(0.1)
+        assert mock_suite.on.await_count == 2  # Quote and bar handlers
+
+        await manager.on_quote_update(Mock(data={"last": 5010.0}))
+        await asyncio.wait_for(task, timeout=1)
+
+        mock_suite.orders.close_position.assert_called_with("POS123")
+        mock_suite.data.get_current_price.assert_not_awaited()  # Priced from the quote itself
+        assert "POS123" not in manager.active_positions
+        assert mock_suite.off.await_count == 2  # Unsubscribed with nothing left to manage
+
+    @pytest.mark.asyncio
+    async def test_quote_update_does_not_wait_on_close(self, mock_suite):
+        """Test that the quote handler returns while the close is in flight and sends it once."""
+        release = asyncio.Event()
+
+        async def slow_close(position_id):
+            await release.wait()
+
+        mock_suite.orders.close_position.side_effect = slow_close
+        manager = ExitManager(mock_suite)
+        manager.active_positions["POS123"] = make_position()
+        manager._position_closed["POS123"] = asyncio.Event()
+
+        await asyncio.wait_for(manager.on_quote_update(Mock(data={"last": 5010.0})), timeout=1)
+        await asyncio.wait_for(manager.on_quote_update(Mock(data={"last": 5011.0})), timeout=1)
+        assert manager.active_positions["POS123"].exiting is True
+
+        release.set()
+        await drain(manager)
+
+        mock_suite.orders.close_position.assert_awaited_once_with("POS123")
+        assert "POS123" not in manager.active_positions
+
+    @pytest.mark.asyncio
+    async def test_check_exit_conditions_target_reached_long(self, mock_suite):
+        """Test exit condition when target is reached for long position."""
+        manager = ExitManager(mock_suite)
+        price = 5010.0
+
+        manager.active_positions["POS123"] = make_position()
+
+        result = await manager._check_exit_conditions("POS123", price, time.monotonic())
 
         assert result["should_exit"] is True
         assert result["reason"] == "Target reached"
@@ -76,38 +157,44 @@ class TestExitManager:
     async def test_check_exit_conditions_stop_hit_long(self, mock_suite):
         """Test exit condition when stop loss is hit for long position."""
         manager = ExitManager(mock_suite)
-        mock_suite.data.get_current_price.return_value = 4995.0
+        price = 4995.0
 
-        manager.active_positions["POS123"] = {
-            "entry_time": datetime.now(),
-            "entry_price": 5000.0,
-            "stop_price": 4995.0,
-            "target_price": 5010.0,
-            "direction": "long",
-            "size": 2
-        }
+        manager.active_positions["POS123"] = make_position()
 
-        result = await manager._check_exit_conditions("POS123")
+        result = await manager._check_exit_conditions("POS123", price, time.monotonic())
 
         assert result["should_exit"] is True
         assert result["reason"] == "Stop loss hit"
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "price,reason",
+        [(4990.0, "Target reached"), (5005.0, "Stop loss hit"), (4998.0, "")],
+    )
+    async def test_check_exit_conditions_short(self, mock_suite, price, reason):
+        """Test target and stop comparisons are mirrored for short positions."""
+        manager = ExitManager(mock_suite)
+
+        manager.active_positions["POS123"] = make_position(
+            direction="short", stop_price=5005.0, target_price=4990.0
+        )
+
+        result = await manager._check_exit_conditions("POS123", price, time.monotonic())
+
+        assert result["should_exit"] is bool(reason)
+        assert result["reason"] == reason
+
     @pytest.mark.asyncio
     async def test_check_exit_conditions_time_exit(self, mock_suite):
         """Test exit condition based on time without progress."""
         manager = ExitManager(mock_suite)
-        mock_suite.data.get_current_price.return_value = 4999.0  # Below entry
+        price = 4999.0  # Below entry
 
-        manager.active_positions["POS123"] = {
-            "entry_time": datetime.now() - timedelta(minutes=6),  # 6 minutes ago
-            "entry_price": 5000.0,
-            "stop_price": 4995.0,
-            "target_price": 5010.0,
-            "direction": "long",
-            "size": 2
-        }
+        manager.active_positions["POS123"] = make_position(
+            entry_time_mono=time.monotonic() - 6 * 60  # 6 minutes ago
+        )
 
-        result = await manager._check_exit_conditions("POS123")
+        result = await manager._check_exit_conditions("POS123", price, time.monotonic())
 
         assert result["should_exit"] is True
         assert "Time exit" in result["reason"]
@@ -123,7 +210,7 @@ class TestExitManager:
         )
         mock_suite.data.get_data.return_value = data
 
-        result = await manager._check_trend_reversal("long")
+        result = manager._check_trend_reversal("long", await manager._current_macd_histogram())
 
         assert result is True
 
@@ -138,27 +225,49 @@ class TestExitManager:
         )
         mock_suite.data.get_data.return_value = data
 
-        result = await manager._check_trend_reversal("short")
+        result = manager._check_trend_reversal("short", await manager._current_macd_histogram())
 
         assert result is True
 
+    @pytest.mark.asyncio
+    async def test_current_macd_histogram_matches_macd_indicator(self, mock_suite):
+        """Test the streaming MACD histogram against the MACD indicator."""
+        from project_x_py.indicators import MACD
+
+        n = 50
+        data = pl.DataFrame({
+            "timestamp": pl.datetime_range(
+                start=datetime(2024, 1, 1, 9, 0),
+                end=datetime(2024, 1, 1, 9, 0) + timedelta(minutes=5 * (n - 1)),
+                interval="5m",
+                eager=True
+            ),
+            "close": [5000.0 + (i % 7) * 1.5 - i * 0.25 for i in range(n)],
+        })
+        manager = ExitManager(mock_suite)
+
+        mock_suite.data.get_data.return_value = data.head(-1)
+        await manager._current_macd_histogram()
+        assert manager._macd.bars == n - 2
+
+        # The next bar only folds in the bar that just completed
+        mock_suite.data.get_data.return_value = data
+        await manager._current_macd_histogram()
+        assert manager._macd.bars == n - 1
+
+        expected = data.pipe(MACD)["macd_histogram"][-1]
+        assert manager._macd.peek(data["close"][-1]) == pytest.approx(expected)
+
     @pytest.mark.asyncio
     async def test_check_trailing_activation_long(self, mock_suite):
         """Test trailing stop activation for long position."""
         manager = ExitManager(mock_suite)
-        mock_suite.data.get_current_price.return_value = 5006.0  # Above breakeven trigger
 
-        manager.active_positions["POS123"] = {
-            "entry_price": 5000.0,
-            "stop_price": 4995.0,
-            "direction": "long",
-            "trailing_stop_activated": False,
-            "breakeven_activated": False
-        }
+        manager.active_positions["POS123"] = make_position()
 
-        await manager._check_trailing_activation("POS123")
+        await manager._check_trailing_activation("POS123", 5006.0)  # Above breakeven trigger
 
-        assert manager.active_positions["POS123"]["trailing_stop_activated"] is True
+        assert manager.active_positions["POS123"].trailing_stop_activated is True
 
     @pytest.mark.asyncio
     async def test_move_stop_to_breakeven(self, mock_suite):
@@ -166,49 +275,77 @@ class TestExitManager:
         manager = ExitManager(mock_suite)
         mock_suite.instrument.tickSize = 0.25
 
-        manager.active_positions["POS123"] = {
-            "entry_price": 5000.0,
-            "stop_price": 4995.0,
-            "direction": "long",
-            "breakeven_activated": False
-        }
+        manager.active_positions["POS123"] = make_position()
 
         await manager._move_stop_to_breakeven("POS123")
 
         # New stop should be entry + offset
         expected_stop = 5000.0 + (5 * 0.25)  # 5 ticks offset
-        assert manager.active_positions["POS123"]["stop_price"] == expected_stop
-        assert manager.active_positions["POS123"]["breakeven_activated"] is True
+        assert manager.active_positions["POS123"].stop_price == expected_stop
+        assert manager.active_positions["POS123"].breakeven_activated is True
 
     @pytest.mark.asyncio
     async def test_update_trailing_stop_long(self, mock_suite, sample_ohlcv_data):
         """Test trailing stop update for long position."""
         from project_x_py.indicators import SAR
 
-        data_with_sar = sample_ohlcv_data.pipe(SAR)
-        data_with_sar = data_with_sar.with_columns(SAR=4998.0)  # SAR below current price
-        mock_suite.data.get_data.return_value = data_with_sar
-        mock_suite.data.get_current_price.return_value = 5005.0
+        mock_suite.data.get_data.return_value = sample_ohlcv_data
+        price = 5012.0  # Above SAR
 
         manager = ExitManager(mock_suite)
-        manager.active_positions["POS123"] = {
-            "stop_price": 4995.0,
-            "direction": "long"
-        }
+        manager.active_positions["POS123"] = make_position()
+
+        current_sar = await manager._current_sar()
+        assert current_sar is not None
+        await manager._update_trailing_stop("POS123", price, current_sar)
+
+        # Stop should be updated to the same SAR value the indicator computes
+        expected_sar = sample_ohlcv_data.pipe(
+            SAR, acceleration=manager.sar_af, maximum=manager.sar_max_af
+        )["sar"][-1]
+        assert manager.active_positions["POS123"].stop_price == expected_sar
 
-        await manager._update_trailing_stop("POS123")
+    @pytest.mark.asyncio
+    async def test_current_sar_folds_only_new_bars(self, mock_suite, sample_ohlcv_data):
+        """Test that the streaming SAR only consumes completed bars it hasn't seen."""
+        manager = ExitManager(mock_suite)
+
+        mock_suite.data.get_data.return_value = sample_ohlcv_data.head(-1)
+        await manager._current_sar()
+        assert manager._sar.bars == len(sample_ohlcv_data) - 2
 
-        # Stop should be updated to SAR value
-        assert manager.active_positions["POS123"]["stop_price"] == 4998.0
+        # Same window again: nothing new to fold in
+        await manager._current_sar()
+        assert manager._sar.bars == len(sample_ohlcv_data) - 2
+
+        # One more bar arrives; the previously forming bar is now completed
+        mock_suite.data.get_data.return_value = sample_ohlcv_data
+        await manager._current_sar()
+        assert manager._sar.bars == len(sample_ohlcv_data) - 1
+
+    @pytest.mark.asyncio
+    async def test_new_bar_trails_all_positions_from_one_read(self, mock_suite, sample_ohlcv_data):
+        """Test that one 15sec bar advances SAR once and trails every position from it."""
+        mock_suite.data.get_data.return_value = sample_ohlcv_data
+        mock_suite.data.get_current_price.return_value = 5012.0
+        manager = ExitManager(mock_suite)
+        for position_id in ("POS1", "POS2"):
+            manager.active_positions[position_id] = make_position(trailing_stop_activated=True)
+            manager._position_closed[position_id] = asyncio.Event()
+
+        await manager.on_new_bar(Mock(data={"timeframe": "15sec"}))
+        await drain(manager)
+
+        assert mock_suite.data.get_data.await_count == 1
+        assert mock_suite.data.get_current_price.await_count == 1
+        assert manager.active_positions["POS1"].stop_price > 4995.0
+        assert manager.active_positions["POS2"].stop_price > 4995.0
 
     @pytest.mark.asyncio
     async def test_exit_position(self, mock_suite):
         """Test position exit."""
         manager = ExitManager(mock_suite)
-        manager.active_positions["POS123"] = {
-            "entry_price": 5000.0,
-            "stop_price": 4995.0
-        }
+        manager.active_positions["POS123"] = make_position()
 
         await manager._exit_position("POS123", "Target reached")
 
@@ -219,8 +356,8 @@ class TestExitManager:
         """Test getting active positions."""
         manager = ExitManager(mock_suite)
         manager.active_positions = {
-            "POS123": {"entry_price": 5000.0},
-            "POS456": {"entry_price": 5010.0}
+            "POS123": make_position(entry_price=5000.0),
+            "POS456": make_position(entry_price=5010.0)
         }
 
         positions = manager.get_active_positions()
@@ -1,11 +1,62 @@
 """Integration tests for the complete trading strategy."""
 
+import asyncio
+from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import polars as pl
 import pytest
 from project_x_py.event_bus import Event, EventType
 
-from main import TrendMomentumXStrategy
+from main import (
+    MAX_PENDING_ORDERS,
+    LatestBar,
+    OrderStatus,
+    PendingOrder,
+    TrendMomentumXStrategy,
+)
+
+
+def make_pending_order(order_id: int) -> PendingOrder:
+    """Build a pending long entry order for event handler tests."""
+    return PendingOrder(
+        id=order_id,
+        direction="long",
+        entry_price=5000.0,
+        stop_price=4995.0,
+        target_price=5010.0,
+        status=OrderStatus.PENDING,
+        created_at=datetime.now(),
+    )
+
+
+def one_minute_bars(minute: int, close: float) -> pl.DataFrame:
+    """A completed 1min bar (3-point range) followed by the bar that just opened on one tick.
+
+    ``minute`` counts from 09:00, matching the sample_1min_data fixture.
+    """
+    start = datetime(2024, 1, 1, 9, 0) + timedelta(minutes=minute)
+    return pl.DataFrame({
+        "timestamp": [start, start + timedelta(minutes=1)],
+        "open": [close - 1.0, close],
+        "high": [close + 1.0, close],
+        "low": [close - 2.0, close],
+        "close": [close, close],
+        "volume": [150, 1],
+    })
+
+
+def opening_tick_event(close: float) -> Event:
+    """NEW_BAR as project-x-py emits it: the new bar built from its first tick only."""
+    tick = {"open": close, "high": close, "low": close, "close": close, "volume": 1}
+    return Event(EventType.NEW_BAR, {"timeframe": "1min", "data": tick})
+
+
+@pytest.fixture
+def mock_suite(mock_suite, sample_1min_data):
+    """Shared mock suite whose bar history is a real frame, so initialize() seeds from it."""
+    mock_suite.data.get_data.return_value = sample_1min_data
+    return mock_suite
 
 
 class TestTrendMomentumXIntegration:
@@ -25,20 +76,94 @@ class TestTrendMomentumXIntegration:
             assert strategy.exit_manager is not None
             assert strategy.running is True
 
+            # Startup history seeded the 1min ATR with a full period
+            assert strategy._atr_samples == strategy.atr_period
+            assert strategy.atr_1min > 0
+            assert strategy.volume_avg_1min > 0
+
+    def test_volume_average_update(self, mock_suite):
+        """Test volume average calculation from 1min bar events."""
+        strategy = TrendMomentumXStrategy()
+
+        strategy.update_volume_average_from_event(LatestBar(volume=100))
+        assert strategy.volume_avg_1min == 100.0
+
+        strategy.update_volume_average_from_event(LatestBar(volume=200))
+        assert strategy.volume_avg_1min == 150.0
+
+        # Once the window is full the oldest volume drops out of the mean
+        for _ in range(strategy.volume_avg_bars):
+            strategy.update_volume_average_from_event(LatestBar(volume=300))
+        assert strategy.volume_avg_1min == 300.0
+
+    def test_update_atr_from_event(self, mock_suite):
+        """Test incremental ATR update from 1min bar events."""
+        strategy = TrendMomentumXStrategy()
+        strategy.atr_period = 2
+
+        strategy.update_atr_from_event(LatestBar(high=5005.0, low=5000.0, close=5002.0))
+        assert strategy.atr_1min == 5.0
+
+        # True range uses the previous close: max(3, |5004 - 5002|, |5001 - 5002|) = 3
+        strategy.update_atr_from_event(LatestBar(high=5004.0, low=5001.0, close=5003.0))
+        assert strategy.atr_1min == 4.0
+
+        # Wilder's smoothing once the period is full: 4 + (10 - 4) / 2
+        strategy.update_atr_from_event(LatestBar(high=5013.0, low=5005.0, close=5010.0))
+        assert strategy.atr_1min == 7.0
+
     @pytest.mark.asyncio
-    async def test_volume_average_update(self, mock_suite, sample_1min_data):
-        """Test volume average calculation."""
+    async def test_atr_follows_completed_bars_not_opening_ticks(self, mock_suite):
+        """Test that 1min NEW_BAR events fold the bar that closed, not the one-tick payload."""
         with patch("main.TradingSuite.create", return_value=mock_suite):
             strategy = TrendMomentumXStrategy()
             await strategy.initialize()
+        seeded_atr = strategy.atr_1min
+        assert seeded_atr == pytest.approx(3.0)
 
-            sample_1min_data = sample_1min_data.with_columns(volume=100)
-            mock_suite.data.get_data.return_value = sample_1min_data
+        for minute in range(20, 30):
+            close = 5001.0 + minute
+            mock_suite.data.get_data.return_value = one_minute_bars(minute, close)
+            await strategy.on_new_bar(opening_tick_event(close + 0.25))
+            # A duplicate event for the same bar must not fold it twice
+            await strategy.on_new_bar(opening_tick_event(close + 0.25))
+            await asyncio.gather(*strategy._background_tasks)
 
-            await strategy.update_volume_average()
+        # Every completed bar has a 3-point true range; the zero-range ticks are ignored
+        assert strategy.atr_1min == pytest.approx(seeded_atr)
 
-            assert strategy.volume_avg_1min > 0
-            mock_suite.data.get_data.assert_called_with("1min", bars=20)
+    @pytest.mark.asyncio
+    async def test_volume_average_follows_completed_bars(self, mock_suite):
+        """Test that the 1min volume average tracks closed bars, not one-tick opening volumes."""
+        with patch("main.TradingSuite.create", return_value=mock_suite):
+            strategy = TrendMomentumXStrategy()
+            await strategy.initialize()
+        # Seeded from the 20 completed sample bars (100..290); the forming row is left out
+        assert strategy.volume_avg_1min == pytest.approx(195.0)
+
+        for minute in range(20, 20 + strategy.volume_avg_bars):
+            close = 5001.0 + minute
+            mock_suite.data.get_data.return_value = one_minute_bars(minute, close)
+            await strategy.on_new_bar(opening_tick_event(close))
+            await asyncio.gather(*strategy._background_tasks)
+
+        # Every completed bar traded 150; the 1-lot opening ticks never enter the window
+        assert strategy.volume_avg_1min == pytest.approx(150.0)
+
+    @pytest.mark.asyncio
+    async def test_stop_uses_ticks_until_atr_warmed_up(self, mock_suite):
+        """Test that one bar after an empty seed doesn't produce an ATR stop."""
+        mock_suite.data.get_data.return_value = pl.DataFrame()
+        strategy = TrendMomentumXStrategy()
+        strategy.suite = mock_suite
+        strategy._tick_stop_distance = strategy.stop_ticks * 0.25
+
+        await strategy.seed_from_history()
+        strategy.update_atr_from_event(LatestBar(high=5005.0, low=4990.0, close=5002.0))
+        assert strategy.atr_1min == 15.0
+
+        stop = await strategy._calculate_stop_price(5000.0, "long")
+        assert stop == 5000.0 - strategy._tick_stop_distance
 
     @pytest.mark.asyncio
     async def test_check_volume_filter_passed(self, mock_suite, sample_ohlcv_data):
@@ -90,6 +215,20 @@ class TestTrendMomentumXIntegration:
 
                 mock_check_long.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_on_new_bar_skips_while_signal_in_flight(self, mock_suite):
+        """Test that overlapping 15sec bars run the signal pipeline only once."""
+        strategy = TrendMomentumXStrategy()
+        strategy.running = True
+        bar = {"timeframe": "15sec", "data": {"close": 5000.0, "volume": 10}}
+
+        with patch.object(strategy, "process_trading_signal", new_callable=AsyncMock) as mock_process:
+            await strategy.on_new_bar(Event(EventType.NEW_BAR, bar))
+            await strategy.on_new_bar(Event(EventType.NEW_BAR, bar))
+            await asyncio.sleep(0)
+
+            mock_process.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_enter_trade_complete_flow(self, mock_suite):
         """Test complete trade entry flow using managed_trade."""
@@ -117,7 +256,7 @@ class TestTrendMomentumXIntegration:
                 mock_managed_trade.enter_long.assert_called_once_with(
                     stop_loss=4995.0, take_profit=5010.0
                 )
-                assert "12345" in strategy.pending_orders
+                assert 12345 in strategy.pending_orders
 
     @pytest.mark.asyncio
     async def test_on_order_filled(self, mock_suite):
@@ -126,13 +265,13 @@ class TestTrendMomentumXIntegration:
             strategy = TrendMomentumXStrategy()
             await strategy.initialize()
 
-            strategy.pending_orders["123"] = {"status": "pending"}
+            strategy.pending_orders[123] = make_pending_order(123)
             mock_order = MagicMock(id=123, filledPrice=5000.0)
             event = Event(EventType.ORDER_FILLED, mock_order)
 
             await strategy.on_order_filled(event)
 
-            assert strategy.pending_orders["123"]["status"] == "active"
+            assert strategy.pending_orders[123].status == OrderStatus.ACTIVE
 
     @pytest.mark.asyncio
     async def test_on_order_failed(self, mock_suite):
@@ -141,13 +280,25 @@ class TestTrendMomentumXIntegration:
             strategy = TrendMomentumXStrategy()
             await strategy.initialize()
 
-            strategy.pending_orders["123"] = {"status": "pending"}
+            strategy.pending_orders[123] = make_pending_order(123)
             mock_order = MagicMock(id=123)
             event = Event(EventType.ORDER_REJECTED, mock_order)
 
             await strategy.on_order_failed(event)
 
-            assert "123" not in strategy.pending_orders
+            assert 123 not in strategy.pending_orders
+
+    def test_pending_orders_bounded(self, mock_suite):
+        """Test that the oldest pending orders are evicted past the cap."""
+        strategy = TrendMomentumXStrategy()
+
+        for order_id in range(MAX_PENDING_ORDERS + 2):
+            strategy._track_pending_order(make_pending_order(order_id))
+
+        assert len(strategy.pending_orders) == MAX_PENDING_ORDERS
+        assert 0 not in strategy.pending_orders
+        assert 1 not in strategy.pending_orders
+        assert MAX_PENDING_ORDERS + 1 in strategy.pending_orders
 
     @pytest.mark.asyncio
     async def test_shutdown_closes_positions(self, mock_suite):
@@ -164,6 +315,17 @@ class TestTrendMomentumXIntegration:
                 mock_suite.orders.close_position.assert_any_call("POS456")
                 mock_suite.disconnect.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_shutdown_cancels_background_tasks(self, mock_suite):
+        """Test that shutdown cancels and reaps in-flight background tasks."""
+        strategy = TrendMomentumXStrategy()
+        strategy.running = True
+        strategy._spawn(asyncio.sleep(60))
+
+        await strategy.shutdown()
+
+        assert not strategy._background_tasks
+
     @pytest.mark.asyncio
     async def test_check_long_entry_flow(self, mock_suite):
         """Test the complete long entry checking flow."""
@@ -55,6 +55,20 @@ class TestOrderBookAnalyzer:
 
         assert imbalance is None
 
+    @pytest.mark.asyncio
+    async def test_get_market_imbalance_cached(self, mock_suite):
+        """Test back-to-back imbalance reads share one orderbook query until invalidated."""
+        mock_suite.orderbook.get_market_imbalance.return_value = {"depth_imbalance": 1.8}
+
+        analyzer = OrderBookAnalyzer(mock_suite)
+        assert await analyzer.get_market_imbalance() == 1.8
+        assert await analyzer.get_market_imbalance() == 1.8
+        assert mock_suite.orderbook.get_market_imbalance.call_count == 1
+
+        analyzer.invalidate_cache()
+        await analyzer.get_market_imbalance()
+        assert mock_suite.orderbook.get_market_imbalance.call_count == 2
+
     @pytest.mark.asyncio
     async def test_detect_icebergs_success(self, mock_suite):
         """Test successful iceberg detection."""
@@ -183,7 +197,9 @@ class TestOrderBookAnalyzer:
                 {"price": 5002.0, "volume": 80},
                 {"price": 5003.0, "volume": 120},
                 {"price": 5004.0, "volume": 100}
-            ]
+            ],
+            "total_bid_volume": 450,
+            "total_ask_volume": 300,
         }
         mock_suite.orderbook.get_orderbook_snapshot.return_value = snapshot
 
@@ -201,14 +201,10 @@ class TestSignalGenerator:
             "fvg_bullish": [False] * 120,
         })
         
-        data_15s = pl.DataFrame({
-            "close": [5000.0],
-        })
-        
-        mock_suite.data.get_data.side_effect = [data_5m, data_15s]
+        mock_suite.data.get_data.return_value = data_5m
         
         generator = SignalGenerator(mock_suite)
-        result = await generator._check_bullish_pattern()
+        result = await generator._check_bullish_pattern(current_price=5000.0)
         
         assert result is True
 
@@ -226,14 +222,10 @@ class TestSignalGenerator:
             "fvg_bearish": [False] * 120,
         })
         
-        data_15s = pl.DataFrame({
-            "close": [5000.0],
-        })
-        
-        mock_suite.data.get_data.side_effect = [data_5m, data_15s]
+        mock_suite.data.get_data.return_value = data_5m
         
         generator = SignalGenerator(mock_suite)
-        result = await generator._check_bearish_pattern()
+        result = await generator._check_bearish_pattern(current_price=5000.0)
         
         assert result is True
 
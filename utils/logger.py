@@ -1,6 +1,24 @@
+import atexit
 import logging
+import queue
 import sys
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Serialize the structured ``event`` payload attached to a record as one JSON line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {"ts": record.created, "logger": record.name, **getattr(record, "event", {})}
+        return orjson.dumps(payload).decode()
+
+
+def has_event(record: logging.LogRecord) -> bool:
+    """Only records logged with ``extra={"event": {...}}`` go to the events file."""
+    return hasattr(record, "event")
 
 
 def setup_logger(name: str = "TrendMomentumX", level: str = "INFO", pxy_level: str = "WARNING") -> logging.Logger:
@@ -22,6 +40,14 @@ def setup_logger(name: str = "TrendMomentumX", level: str = "INFO", pxy_level: s
     )
     file_handler.setLevel(logging.DEBUG)
 
+    # Structured signal events (one JSON object per line) for analyze_signals.py
+    event_handler = logging.FileHandler(
+        f"signals_{datetime.now().strftime('%Y%m%d')}.jsonl"
+    )
+    event_handler.setLevel(logging.DEBUG)
+    event_handler.addFilter(has_event)
+    event_handler.setFormatter(JsonLinesFormatter())
+
     formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
@@ -30,11 +56,20 @@ def setup_logger(name: str = "TrendMomentumX", level: str = "INFO", pxy_level: s
     console_handler.setFormatter(formatter)
     file_handler.setFormatter(formatter)
 
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    # Loggers only enqueue records; a listener thread does the console/file I/O so a
+    # slow disk or a long traceback never stalls the event loop
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    listener = QueueListener(
+        log_queue, console_handler, file_handler, event_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)  # Drain what is still queued on interpreter exit
+
+    logger.addHandler(queue_handler)
 
     # Configure strategy module loggers to use same handlers
-    configure_strategy_logging(log_level, console_handler, file_handler)
+    configure_strategy_logging(log_level, queue_handler)
 
     # Configure project-x-py loggers to show warnings and errors
     configure_project_x_logging(px_log_level, file_handler)
@@ -42,7 +77,7 @@ def setup_logger(name: str = "TrendMomentumX", level: str = "INFO", pxy_level: s
     return logger
 
 
-def configure_strategy_logging(log_level: int, console_handler: logging.StreamHandler, file_handler: logging.FileHandler) -> None:
+def configure_strategy_logging(log_level: int, queue_handler: QueueHandler) -> None:
     """Configure strategy module loggers to use the same handlers as main logger."""
     # List of strategy modules that need logging
     strategy_modules = [
@@ -61,9 +96,8 @@ def configure_strategy_logging(log_level: int, console_handler: logging.StreamHa
         # Clear existing handlers to avoid duplicates
         module_logger.handlers.clear()
 
-        # Add the same handlers as main logger
-        module_logger.addHandler(console_handler)
-        module_logger.addHandler(file_handler)
+        # Add the same queue as main logger
+        module_logger.addHandler(queue_handler)
 
         # Don't propagate to avoid duplicate logs
         module_logger.propagate = False